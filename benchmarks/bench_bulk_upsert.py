@@ -0,0 +1,41 @@
+"""
+Rows per second of DatabaseService._bulk_upsert at 1k, 10k and 100k rows
+
+Each size starts from an empty movies table and measures a first insert,
+a re-upsert of identical rows (all unchanged) and a re-upsert with every
+title changed (all updated).
+
+Usage: python benchmarks/bench_bulk_upsert.py [sizes...]
+"""
+import sys
+
+import common
+from database import Movie, init_db
+from db_service import DatabaseService
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def run(sizes):
+    init_db()
+    print(f"{'rows':>8}  {'phase':<10} {'seconds':>8} {'rows/s':>10}  counts")
+    for size in sizes:
+        with DatabaseService() as db_service:
+            db_service.db.query(Movie).delete()
+            db_service.db.commit()
+
+            rows = common.movie_rows(size)
+            changed = common.movie_rows(size, title_suffix=' (Remastered)')
+            for phase, batch in (('insert', rows), ('unchanged', rows), ('update', changed)):
+                result = {}
+                seconds = common.timed(
+                    lambda: result.update(db_service.create_or_update_movies_batch(batch))
+                )
+                print(f"{size:>8}  {phase:<10} {seconds:>8.3f} {size / seconds:>10,.0f}  {result}")
+
+
+if __name__ == '__main__':
+    try:
+        run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
+    finally:
+        common.cleanup()
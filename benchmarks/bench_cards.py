@@ -0,0 +1,75 @@
+"""
+Card projection vs full ORM entities for one page of cards
+
+Compares a 16-card popular-movies page built with card_columns() and
+card_from_row() against loading full Movie entities and calling to_dict(),
+on a 20k-title catalog. Each request uses a fresh DatabaseService, as a
+web request does. Reports latency, tracemalloc peak during the request and
+the memory still held by the finished page.
+
+Usage: python benchmarks/bench_cards.py [titles]
+"""
+import sys
+import timeit
+import tracemalloc
+
+import common
+from database import Movie, init_db
+from db_service import DatabaseService
+from sqlalchemy import desc
+
+DEFAULT_TITLES = 20_000
+PAGE_SIZE = 16
+NUMBER = 200
+
+
+def orm_page(offset=0):
+    with DatabaseService() as db_service:
+        movies = db_service.db.query(Movie)\
+            .order_by(desc(Movie.popularity))\
+            .offset(offset)\
+            .limit(PAGE_SIZE)\
+            .all()
+        return [movie.to_dict() for movie in movies]
+
+
+def card_page(offset=0):
+    with DatabaseService() as db_service:
+        rows = db_service.db.query(*Movie.card_columns())\
+            .order_by(desc(Movie.popularity))\
+            .offset(offset)\
+            .limit(PAGE_SIZE)\
+            .all()
+        return [Movie.card_from_row(row) for row in rows]
+
+
+def allocations(func):
+    """(peak traced bytes during one call, bytes still held by its result)"""
+    func()  # warm statement caches
+    tracemalloc.start()
+    page = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+    return peak, retained
+
+
+def run(titles):
+    init_db()
+    with DatabaseService() as db_service:
+        for start in range(0, titles, 10_000):
+            db_service.create_or_update_movies_batch(common.movie_rows(min(10_000, titles - start), start))
+
+    print(f"{titles:,} titles, {PAGE_SIZE}-card page, {NUMBER} requests")
+    print(f"{'path':<10} {'ms/request':>11} {'peak KiB':>9} {'page KiB':>9}")
+    for name, func in (('to_dict', orm_page), ('card', card_page)):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER
+        peak, retained = allocations(func)
+        print(f"{name:<10} {seconds * 1000:>11.3f} {peak / 1024:>9.1f} {retained / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    try:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TITLES)
+    finally:
+        common.cleanup()
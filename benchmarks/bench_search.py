@@ -0,0 +1,62 @@
+"""
+FTS5 prefix search vs the LIKE fallback on a 100k-title catalog
+
+Times DatabaseService.search_movies, which queries movies_fts, against the
+leading-wildcard ilike scan it falls back to when FTS5 is unavailable.
+
+Usage: python benchmarks/bench_search.py [titles]
+"""
+import statistics
+import sys
+import time
+
+import common
+from database import Movie, init_db
+from db_service import DatabaseService
+from sqlalchemy import desc
+
+DEFAULT_TITLES = 100_000
+QUERIES = ['da', 'shadow', 'king star', 'ghost 1234', 'empire 99', 'zzz']
+REPEAT = 20
+PER_PAGE = 15
+
+
+def like_search(db_service, query):
+    """The search_movies fallback path, without the FTS attempt in front of it"""
+    rows = db_service.db.query(*Movie.card_columns())\
+        .filter(Movie.title.ilike(f"%{query}%"))\
+        .order_by(desc(Movie.popularity))\
+        .limit(PER_PAGE)\
+        .all()
+    return [Movie.card_from_row(row) for row in rows]
+
+
+def median_ms(func):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(titles):
+    init_db()
+    with DatabaseService() as db_service:
+        for start in range(0, titles, 10_000):
+            db_service.create_or_update_movies_batch(common.movie_rows(min(10_000, titles - start), start))
+
+        print(f"{titles:,} titles, median of {REPEAT} runs")
+        print(f"{'query':<14} {'fts ms':>8} {'like ms':>9} {'speedup':>8}  hits")
+        for query in QUERIES:
+            hits = len(db_service.search_movies(query, per_page=PER_PAGE))
+            fts = median_ms(lambda: db_service.search_movies(query, per_page=PER_PAGE))
+            like = median_ms(lambda: like_search(db_service, query))
+            print(f"{query:<14} {fts:>8.2f} {like:>9.2f} {like / fts:>7.1f}x  {hits}")
+
+
+if __name__ == '__main__':
+    try:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TITLES)
+    finally:
+        common.cleanup()
@@ -0,0 +1,64 @@
+"""
+Shared setup for the benchmark scripts
+
+Importing this module points DATABASE_URL at a throwaway SQLite file, so it
+must be imported before database / db_service. The file gets the same
+PRAGMAs, indexes and FTS tables as production via init_db().
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_TMP_DIR = tempfile.mkdtemp(prefix='homeflix-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}"
+os.environ.setdefault('IMAGE_CACHE_DIR', os.path.join(_TMP_DIR, 'image_cache'))
+
+GENRES = ['Action', 'Comedy', 'Drama', 'Horror', 'Romance', 'Sci-Fi', 'Thriller']
+WORDS = ['dark', 'night', 'return', 'last', 'city', 'love', 'star', 'king',
+         'shadow', 'river', 'winter', 'empire', 'ocean', 'ghost', 'storm']
+
+
+def movie_rows(count: int, start: int = 0, title_suffix: str = '') -> List[Dict[str, Any]]:
+    """Build deterministic movie rows shaped like the ones sync_data produces"""
+    rows = []
+    for i in range(start, start + count):
+        title = ' '.join(WORDS[(i * k) % len(WORDS)] for k in (1, 3, 7)).title()
+        rows.append({
+            'imdb_id': f"tt{i:08d}",
+            'tmdb_id': i,
+            'title': f"{title} {i}{title_suffix}",
+            'overview': f"Overview for title {i}. " * 8,
+            'release_date': f"{1980 + i % 45}-01-01",
+            'year': str(1980 + i % 45),
+            'rating': f"{i % 10}.{i % 7}",
+            'duration': f"{80 + i % 90} min",
+            'genres': [GENRES[i % len(GENRES)], GENRES[(i * 3) % len(GENRES)]],
+            'poster_path': f"/p{i}.jpg",
+            'backdrop_path': f"/b{i}.jpg",
+            'vote_average': (i % 100) / 10,
+            'vote_count': i % 5000,
+            'popularity': float(i % 1000),
+            'is_trending': i % 50 == 0,
+        })
+    return rows
+
+
+def timed(func: Callable, repeat: int = 1) -> float:
+    """Best wall-clock seconds of func() over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cleanup():
+    """Remove the throwaway database directory"""
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
@@ -3,7 +3,7 @@ Configuration module for centralized settings management
 Environment variables and constants in one place
 """
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -11,10 +11,45 @@ from typing import Optional
 class CacheConfig:
     """Cache duration settings in seconds"""
     TMDB_DATA: int = 3600  # 1 hour
+    TMDB_STALE_GRACE: int = int(os.getenv('TMDB_STALE_SECONDS', '86400'))  # serve stale TMDB data while refreshing
     VIDSRC_DATA: int = 600  # 10 minutes
     POSTER: int = 7200  # 2 hours
     BACKDROP: int = 7200  # 2 hours
     SEARCH_RESULTS: int = 300  # 5 minutes
+    HOME_PAGE: int = 3600  # 1 hour, rendered home catalog (also invalidated by sync)
+    IMAGE_MAX_AGE: int = 86400  # 1 day, browser cache for proxied images before ETag revalidation
+    MISSING_IMAGE: int = 1800  # 30 minutes, titles known to have no image
+    FAILED_IMAGE: int = 60  # 1 minute, upstream errors while fetching an image
+    
+    # Backend for cross-worker namespaces: 'memory' (per process) or 'sqlite' (shared file)
+    BACKEND: str = os.getenv('CACHE_BACKEND', 'memory')
+    SHARED_PATH: str = os.getenv('CACHE_SQLITE_PATH', 'cache.db')
+    SHARED_NAMESPACES: tuple = ('tmdb', 'posters', 'backdrops', 'missing_images', 'failed_images')
+    
+    # Default per-namespace bounds for the in-process LRU, with overrides
+    MAX_ENTRIES: int = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
+    MAX_BYTES: int = int(os.getenv('CACHE_MAX_MB', '64')) * 1024 * 1024
+    NAMESPACE_LIMITS: dict = field(default_factory=lambda: {
+        # namespace: (max entries, max bytes)
+        'posters': (100000, 16 * 1024 * 1024),
+        'backdrops': (100000, 16 * 1024 * 1024),
+        'home_pages': (100, 32 * 1024 * 1024),
+    })
+    
+    # Background expiry sweep and global budget across all in-process namespaces
+    SWEEP_INTERVAL: int = int(os.getenv('CACHE_SWEEP_SECONDS', '60'))
+    MEMORY_BUDGET: int = int(os.getenv('CACHE_MEMORY_BUDGET_MB', '256')) * 1024 * 1024
+    
+    def namespace_ttls(self) -> dict:
+        """TTL in seconds of each known cache namespace, used by the sweeper"""
+        return {
+            'tmdb': self.TMDB_DATA + self.TMDB_STALE_GRACE,
+            'posters': self.POSTER,
+            'backdrops': self.BACKDROP,
+            'missing_images': self.MISSING_IMAGE,
+            'failed_images': self.FAILED_IMAGE,
+            'home_pages': self.HOME_PAGE,
+        }
 
 
 @dataclass
@@ -28,11 +63,37 @@ class APIConfig:
     TMDB_IMAGE_BASE_URL: str = 'https://image.tmdb.org/t/p/w500'
     TMDB_BACKDROP_BASE_URL: str = 'https://image.tmdb.org/t/p/w1280'
     
+    # TMDB image size buckets, smallest first, and the sizes offered in srcset
+    TMDB_IMAGE_HOST: str = 'https://image.tmdb.org/t/p'
+    POSTER_SIZES: tuple = ('w92', 'w154', 'w185', 'w342', 'w500', 'w780', 'original')
+    BACKDROP_SIZES: tuple = ('w300', 'w780', 'w1280', 'original')
+    DEFAULT_POSTER_SIZE: str = 'w500'
+    DEFAULT_BACKDROP_SIZE: str = 'w1280'
+    POSTER_SRCSET_SIZES: tuple = ('w185', 'w342', 'w500')
+    BACKDROP_SRCSET_SIZES: tuple = ('w300', 'w780', 'w1280')
+    
     # Request timeout in seconds
     REQUEST_TIMEOUT: int = 10
     
     # Max retries for failed requests
     MAX_RETRIES: int = 3
+    
+    # Keep-alive connection pool and chunk size for image proxy fetches
+    IMAGE_POOL_SIZE: int = int(os.getenv('IMAGE_POOL_SIZE', '20'))
+    IMAGE_CHUNK_SIZE: int = 64 * 1024
+    
+    # Keep-alive connection pool for api.themoviedb.org
+    TMDB_POOL_SIZE: int = int(os.getenv('TMDB_POOL_SIZE', '10'))
+    
+    # Token bucket for all TMDB API calls (sync and web). Set TMDB_RATE_LIMIT_PATH
+    # to a SQLite file visible to every process to share one bucket between them
+    TMDB_RATE_LIMIT: float = float(os.getenv('TMDB_RATE_LIMIT', '40'))  # requests per second
+    TMDB_RATE_BURST: int = int(os.getenv('TMDB_RATE_BURST', '40'))
+    TMDB_RATE_LIMIT_PATH: str = os.getenv('TMDB_RATE_LIMIT_PATH', '')
+    TMDB_RATE_MAX_WAIT: float = float(os.getenv('TMDB_RATE_MAX_WAIT', '30'))  # seconds
+    
+    # Background threads refreshing stale TMDB cache entries (per process)
+    TMDB_REFRESH_WORKERS: int = int(os.getenv('TMDB_REFRESH_WORKERS', '2'))
 
 
 @dataclass
@@ -44,6 +105,24 @@ class DatabaseConfig:
     MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '20'))
     POOL_RECYCLE: int = 3600  # Recycle connections after 1 hour
     POOL_PRE_PING: bool = True  # Check connection health before using
+    
+    # SQLite tuning applied to every new connection (ignored for other databases)
+    # WAL lets page reads proceed while the sync scheduler is writing
+    SQLITE_JOURNAL_MODE: str = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS: str = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE: int = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # bytes
+    SQLITE_CACHE_SIZE: int = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))  # negative = KiB, i.e. 64 MiB
+    SQLITE_TEMP_STORE: str = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))  # milliseconds
+
+
+@dataclass
+class ImageCacheConfig:
+    """On-disk image cache settings (shared by all workers)"""
+    DIR: str = os.getenv('IMAGE_CACHE_DIR', 'image_cache')
+    MAX_BYTES: int = int(os.getenv('IMAGE_CACHE_MAX_MB', '1024')) * 1024 * 1024
+    # Evict down to this fraction of MAX_BYTES once the cap is exceeded
+    EVICT_TARGET: float = 0.9
 
 
 @dataclass
@@ -67,12 +146,15 @@ class PaginationConfig:
     SEARCH_PER_PAGE: int = 15
     MAX_PER_PAGE: int = 50
     TRENDING_LIMIT: int = 16
+    # Leading feed pages precomputed by sync into the feed_snapshots table
+    SNAPSHOT_PAGES: int = int(os.getenv('FEED_SNAPSHOT_PAGES', '5'))
 
 
 # Global config instances
 cache_config = CacheConfig()
 api_config = APIConfig()
 db_config = DatabaseConfig()
+image_cache_config = ImageCacheConfig()
 server_config = ServerConfig()
 pagination_config = PaginationConfig()
 
@@ -118,3 +200,19 @@ def get_embed_sources(media_type: str, identifier: str, season: Optional[int] =
             f"https://autoembed.co/tv/tmdb/{identifier}-{season}-{episode}",
         ]
     return []
+
+
+def get_image_srcset(kind: str, media_type: str, tmdb_id: int) -> str:
+    """
+    Build a srcset value offering several widths of a proxied image
+    
+    Args:
+        kind: 'poster' or 'backdrop'
+        media_type: 'movie' or 'tv'
+        tmdb_id: TMDB ID
+    
+    Returns:
+        srcset string, e.g. "/poster/movie/1?size=w185 185w, ..."
+    """
+    sizes = api_config.POSTER_SRCSET_SIZES if kind == 'poster' else api_config.BACKDROP_SRCSET_SIZES
+    return ', '.join(f"/{kind}/{media_type}/{tmdb_id}?size={size} {size[1:]}w" for size in sizes)
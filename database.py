@@ -1,13 +1,36 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, Boolean, JSON, Index
+from sqlalchemy import create_engine, event, inspect, Column, Integer, String, Text, Float, DateTime, Boolean, JSON, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
 from datetime import datetime
 from contextlib import contextmanager
-from config import db_config
+from config import db_config, get_image_srcset
 
 Base = declarative_base()
 
+
+def _card_dict(row, type_label: str, url_type: str) -> dict:
+    """
+    Build a card dictionary from a projected row (see card_columns)
+    Keys match the corresponding subset of to_dict()
+    """
+    data = dict(row._mapping)
+    data.pop('id', None)
+    # The paths stay in the card so the image caches can be filled from it
+    poster_path = data.get('poster_path')
+    backdrop_path = data.get('backdrop_path')
+    tmdb_id = data.get('tmdb_id')
+    data.update({
+        'type': type_label,
+        'id': data.get('imdb_id'),  # Add id alias for consistency
+        'poster_url': f'/poster/{url_type}/{tmdb_id}' if tmdb_id and poster_path else None,
+        'backdrop_url': f'/backdrop/{url_type}/{tmdb_id}' if tmdb_id and backdrop_path else None,
+        'poster_srcset': get_image_srcset('poster', url_type, tmdb_id) if tmdb_id and poster_path else None,
+        'backdrop_srcset': get_image_srcset('backdrop', url_type, tmdb_id) if tmdb_id and backdrop_path else None,
+    })
+    return data
+
+
 class Movie(Base):
     __tablename__ = 'movies'
     
@@ -37,6 +60,22 @@ class Movie(Base):
         Index('idx_movie_release_date', 'release_date'),
     )
     
+    # Columns needed to render a title card, plus extras for the hero banner
+    CARD_FIELDS = ('id', 'imdb_id', 'tmdb_id', 'title', 'release_date', 'year', 'quality',
+                   'poster_path', 'backdrop_path')
+    HERO_FIELDS = ('overview', 'rating', 'duration', 'genres')
+    
+    @classmethod
+    def card_columns(cls, hero: bool = False) -> list:
+        """Columns to select for card dictionaries (see card_from_row)"""
+        fields = cls.CARD_FIELDS + (cls.HERO_FIELDS if hero else ())
+        return [getattr(cls, field) for field in fields]
+    
+    @staticmethod
+    def card_from_row(row) -> dict:
+        """Lightweight card dictionary built from a card_columns() row"""
+        return _card_dict(row, 'movie', 'movie')
+    
     def to_dict(self):
         return {
             'type': 'movie',  # Add type field
@@ -52,6 +91,10 @@ class Movie(Base):
             'genres': self.genres,
             'poster_url': f'/poster/movie/{self.tmdb_id}' if self.tmdb_id and self.poster_path else None,
             'backdrop_url': f'/backdrop/movie/{self.tmdb_id}' if self.tmdb_id and self.backdrop_path else None,
+            'poster_srcset': get_image_srcset('poster', 'movie', self.tmdb_id) if self.tmdb_id and self.poster_path else None,
+            'backdrop_srcset': get_image_srcset('backdrop', 'movie', self.tmdb_id) if self.tmdb_id and self.backdrop_path else None,
+            'poster_path': self.poster_path,
+            'backdrop_path': self.backdrop_path,
             'vote_average': self.vote_average,
             'popularity': self.popularity,
             'quality': self.quality,
@@ -86,6 +129,22 @@ class TVShow(Base):
         Index('idx_tvshow_first_air_date', 'first_air_date'),
     )
     
+    # Columns needed to render a title card, plus extras for the hero banner
+    CARD_FIELDS = ('id', 'imdb_id', 'tmdb_id', 'title', 'first_air_date', 'year',
+                   'poster_path', 'backdrop_path')
+    HERO_FIELDS = ('overview', 'rating', 'number_of_seasons', 'genres')
+    
+    @classmethod
+    def card_columns(cls, hero: bool = False) -> list:
+        """Columns to select for card dictionaries (see card_from_row)"""
+        fields = cls.CARD_FIELDS + (cls.HERO_FIELDS if hero else ())
+        return [getattr(cls, field) for field in fields]
+    
+    @staticmethod
+    def card_from_row(row) -> dict:
+        """Lightweight card dictionary built from a card_columns() row"""
+        return _card_dict(row, 'series', 'tv')
+    
     def to_dict(self):
         return {
             'type': 'series',  # Add type field
@@ -101,6 +160,10 @@ class TVShow(Base):
             'genres': self.genres,
             'poster_url': f'/poster/tv/{self.tmdb_id}' if self.tmdb_id and self.poster_path else None,
             'backdrop_url': f'/backdrop/tv/{self.tmdb_id}' if self.tmdb_id and self.backdrop_path else None,
+            'poster_srcset': get_image_srcset('poster', 'tv', self.tmdb_id) if self.tmdb_id and self.poster_path else None,
+            'backdrop_srcset': get_image_srcset('backdrop', 'tv', self.tmdb_id) if self.tmdb_id and self.backdrop_path else None,
+            'poster_path': self.poster_path,
+            'backdrop_path': self.backdrop_path,
             'vote_average': self.vote_average,
             'popularity': self.popularity,
             'is_trending': self.is_trending,
@@ -234,6 +297,51 @@ class WatchedItems(Base):
         return result
 
 
+
+class CatalogState(Base):
+    """
+    Version stamps for derived data; bumped whenever the catalog changes
+    so caches built from it (e.g. the rendered home page) can be invalidated
+    """
+    __tablename__ = 'catalog_state'
+    
+    key = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+
+class FeedSnapshot(Base):
+    """
+    Precomputed page of a home feed (latest/trending), written by sync
+    so the leading pages are served without sorting the catalog
+    """
+    __tablename__ = 'feed_snapshots'
+    
+    feed = Column(String(30), primary_key=True)  # e.g. 'latest_movies', 'trending_tvshows'
+    page = Column(Integer, primary_key=True)
+    per_page = Column(Integer, nullable=False)
+    items = Column(JSON, nullable=False)  # Card dictionaries
+    next_cursor = Column(String(100))
+    # catalog_state version the page was built from; stale once the catalog changes
+    catalog_version = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TMDBDocument(Base):
+    """
+    Persisted TMDB response (title details with credits/ratings, season
+    episode lists, IMDB lookups), keyed like the 'tmdb' cache so detail
+    pages survive restarts without refetching
+    """
+    __tablename__ = 'tmdb_documents'
+    
+    cache_key = Column(String(80), primary_key=True)  # TMDBClient.cache_key()
+    path = Column(String(255), nullable=False, index=True)  # e.g. '/tv/1399/season/1'
+    payload = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 # Database setup with optimized connection pooling
 engine = create_engine(
     db_config.URL,
@@ -246,14 +354,103 @@ engine = create_engine(
     connect_args={'check_same_thread': False} if 'sqlite' in db_config.URL else {}
 )
 
+
+def _sqlite_pragmas() -> dict:
+    """PRAGMA name -> value for every new SQLite connection, from DatabaseConfig"""
+    return {
+        'journal_mode': db_config.SQLITE_JOURNAL_MODE,
+        'synchronous': db_config.SQLITE_SYNCHRONOUS,
+        'mmap_size': db_config.SQLITE_MMAP_SIZE,
+        'cache_size': db_config.SQLITE_CACHE_SIZE,
+        'temp_store': db_config.SQLITE_TEMP_STORE,
+        'busy_timeout': db_config.SQLITE_BUSY_TIMEOUT,
+    }
+
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, 'connect')
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply the SQLite performance profile to a freshly opened connection"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in _sqlite_pragmas().items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
 # Thread-safe session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 ScopedSession = scoped_session(SessionLocal)
 
 
+# Title search indexes: external-content FTS5 tables kept in sync by triggers
+FTS_TABLES = {
+    'movies': 'movies_fts',
+    'tvshows': 'tvshows_fts',
+}
+
+
+def _fts_statements(table: str, fts_table: str) -> list[str]:
+    """DDL for one external-content FTS5 title index and its sync triggers"""
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            title, content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table}(rowid, title) VALUES (new.id, new.title);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title) VALUES ('delete', old.id, old.title);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF title ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO {fts_table}(rowid, title) VALUES (new.id, new.title);
+        END""",
+    ]
+
+
+def init_fts():
+    """
+    Create the FTS5 title indexes used by search (SQLite only)
+    Indexes that are missing rows, e.g. created on an existing database, are rebuilt
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    try:
+        with engine.begin() as conn:
+            for table, fts_table in FTS_TABLES.items():
+                for statement in _fts_statements(table, fts_table):
+                    conn.execute(text(statement))
+
+                indexed = conn.execute(text(f"SELECT COUNT(*) FROM {fts_table}_docsize")).scalar()
+                total = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                if indexed != total:
+                    conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+                    print(f"🔎 Rebuilt {fts_table} search index ({total} rows)")
+    except Exception as e:
+        # Search falls back to LIKE when FTS5 is unavailable
+        print(f"⚠️  Could not create full-text search indexes: {e}")
+
+
+def _drop_outdated_snapshots():
+    """Drop a feed_snapshots table from before catalog_version (sync rebuilds it)"""
+    inspector = inspect(engine)
+    if not inspector.has_table('feed_snapshots'):
+        return
+    columns = {column['name'] for column in inspector.get_columns('feed_snapshots')}
+    if 'catalog_version' not in columns:
+        FeedSnapshot.__table__.drop(bind=engine)
+        print("📸 Dropped outdated home feed snapshots")
+
+
 def init_db():
     """Initialize the database with all tables and indexes"""
+    _drop_outdated_snapshots()
     Base.metadata.create_all(bind=engine)
+    init_fts()
     print("✅ Database initialized successfully with optimized indexes")
 
 
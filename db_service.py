@@ -1,13 +1,53 @@
-from database import Movie, TVShow, get_db, close_db, MyList, WatchHistory
-from sqlalchemy import text, desc
+from database import Movie, TVShow, CatalogState, FeedSnapshot, TMDBDocument, get_db, close_db, MyList, WatchHistory
+from sqlalchemy import text, desc, tuple_, select, cast, or_, Text, JSON
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from utils import measure_time
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# CatalogState key for the movies/TV shows catalog
+CATALOG_KEY = 'catalog'
+
+# Max bound parameters per IN (...) lookup, well under SQLite's variable limit
+IN_CHUNK_SIZE = 500
+
+
+def encode_feed_cursor(date: Optional[str], row_id: int) -> str:
+    """
+    Encode the (date, id) position of the last row of a feed page
+    
+    Args:
+        date: release_date / first_air_date of the row (may be None)
+        row_id: Primary key of the row
+        
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    raw = json.dumps([date, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_feed_cursor(cursor: str) -> Tuple[Optional[str], int]:
+    """
+    Decode a cursor made by encode_feed_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Invalid feed cursor: {cursor!r}") from e
+    if not isinstance(row_id, int) or not (date is None or isinstance(date, str)):
+        raise ValueError(f"Invalid feed cursor: {cursor!r}")
+    return date, row_id
+
 
 class DatabaseService:
     """
@@ -69,7 +109,7 @@ class DatabaseService:
             logger.error(f"Error creating/updating movie: {e}")
             raise
     
-    def create_or_update_movies_batch(self, movies_data: List[Dict[str, Any]]) -> int:
+    def create_or_update_movies_batch(self, movies_data: List[Dict[str, Any]]) -> Dict[str, int]:
         """
         Create or update multiple movies in batch with bulk operations
         Much faster than individual inserts
@@ -78,38 +118,194 @@ class DatabaseService:
             movies_data: List of movie data dictionaries
             
         Returns:
-            Number of movies processed
+            Dictionary with inserted, updated and unchanged counts
         """
         try:
-            processed_count = 0
-            # Use bulk operations for better performance
-            for movie_data in movies_data:
-                try:
-                    movie = self.get_movie_by_imdb_id(movie_data.get('imdb_id'))
-                    
-                    if movie:
-                        # Update existing movie
-                        for key, value in movie_data.items():
-                            if hasattr(movie, key) and getattr(movie, key) != value:
-                                setattr(movie, key, value)
-                        movie.updated_at = datetime.utcnow()
-                    else:
-                        # Create new movie
-                        movie = Movie(**movie_data)
-                        self.db.add(movie)
-                    processed_count += 1
-                except Exception as e:
-                    logger.error(f"Error processing movie {movie_data.get('imdb_id')}: {e}")
-                    continue
-            
-            self.db.commit()
-            return processed_count
+            return self._bulk_upsert(Movie, movies_data)
         except Exception as e:
             self.db.rollback()
             logger.error(f"Batch movie operation failed: {e}")
             raise
     
+    def _bulk_upsert(self, model, rows_data: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Insert or update rows keyed on imdb_id in chunked executemany batches
+        
+        SQLite and PostgreSQL use INSERT ... ON CONFLICT(imdb_id) DO UPDATE,
+        touching only rows whose values actually changed. Other dialects fall
+        back to per-row ORM upserts.
+        
+        Args:
+            model: Movie or TVShow
+            rows_data: Row dictionaries; unknown keys are ignored and the
+                last row wins for a repeated imdb_id
+            
+        Returns:
+            Dictionary with inserted, updated and unchanged counts
+        """
+        table = model.__table__
+        columns = set(table.columns.keys()) - {'id', 'created_at', 'updated_at'}
+        
+        rows_by_id = {}
+        for row in rows_data:
+            imdb_id = row.get('imdb_id')
+            if imdb_id:
+                rows_by_id[imdb_id] = {key: value for key, value in row.items() if key in columns}
+        
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not rows_by_id:
+            return counts
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            return self._upsert_rows_orm(model, list(rows_by_id.values()))
+        
+        # executemany needs every row of a statement to carry the same keys
+        groups = {}
+        for row in rows_by_id.values():
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        
+        for keys, rows in groups.items():
+            stmt = insert(table)
+            update_keys = [key for key in keys if key != 'imdb_id']
+            if update_keys:
+                changed = []
+                for key in update_keys:
+                    current, incoming = table.c[key], stmt.excluded[key]
+                    if isinstance(table.c[key].type, JSON):
+                        # JSON has no equality operator on PostgreSQL
+                        current, incoming = cast(current, Text), cast(incoming, Text)
+                    changed.append(current.is_distinct_from(incoming))
+                set_ = {key: stmt.excluded[key] for key in update_keys}
+                set_['updated_at'] = datetime.utcnow()
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['imdb_id'], set_=set_, where=or_(*changed)
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=['imdb_id'])
+            stmt = stmt.returning(table.c.imdb_id)
+            
+            for start in range(0, len(rows), IN_CHUNK_SIZE):
+                chunk = rows[start:start + IN_CHUNK_SIZE]
+                existing = self._existing_imdb_ids(model, [row['imdb_id'] for row in chunk])
+                written = set(self.db.execute(stmt, chunk).scalars())
+                
+                counts['inserted'] += len(written - existing)
+                counts['updated'] += len(written & existing)
+                counts['unchanged'] += len(chunk) - len(written)
+        
+        if counts['inserted'] or counts['updated']:
+            self._bump_catalog_version()
+        self.db.commit()
+        return counts
+    
+    def _upsert_rows_orm(self, model, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Per-row ORM upsert for dialects without ON CONFLICT support"""
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for row in rows:
+            try:
+                instance = self.db.query(model).filter(model.imdb_id == row['imdb_id']).first()
+                
+                if instance:
+                    # Update existing row only if data has changed
+                    changed = False
+                    for key, value in row.items():
+                        if getattr(instance, key) != value:
+                            setattr(instance, key, value)
+                            changed = True
+                    if changed:
+                        instance.updated_at = datetime.utcnow()
+                        counts['updated'] += 1
+                    else:
+                        counts['unchanged'] += 1
+                else:
+                    self.db.add(model(**row))
+                    counts['inserted'] += 1
+            except Exception as e:
+                logger.error(f"Error processing {model.__tablename__} row {row.get('imdb_id')}: {e}")
+                continue
+        
+        if counts['inserted'] or counts['updated']:
+            self._bump_catalog_version()
+        self.db.commit()
+        return counts
+    
+    def _latest_page(self, model, date_column, page: int, per_page: int,
+                     cursor: Optional[str], *filters) -> Tuple[list, Optional[str]]:
+        """
+        Fetch one page of a newest-first feed ordered by (date DESC NULLS LAST, id DESC)
+        
+        With a cursor the page starts right after the cursor row (keyset
+        pagination), so deep pages cost the same as the first one and rows
+        do not shift when new titles are inserted. Without one, page is
+        used as a plain offset.
+        
+        Returns:
+            Tuple of (card column rows, next_cursor); next_cursor is None on the last page
+        """
+        order = (date_column.desc().nullslast(), model.id.desc())
+        query = self.db.query(*model.card_columns()).filter(*filters)
+        
+        if not cursor:
+            rows = query.order_by(*order).offset((page - 1) * per_page).limit(per_page).all()
+        else:
+            date, row_id = decode_feed_cursor(cursor)
+            rows = []
+            if date is not None:
+                # Dated rows after the cursor, an index range seek
+                rows = query\
+                    .filter(tuple_(date_column, model.id) < tuple_(date, row_id))\
+                    .order_by(*order)\
+                    .limit(per_page)\
+                    .all()
+            if len(rows) < per_page:
+                # Undated rows sort last; continue into them by id
+                undated = query.filter(date_column.is_(None))
+                if date is None:
+                    undated = undated.filter(model.id < row_id)
+                rows += undated.order_by(model.id.desc()).limit(per_page - len(rows)).all()
+        
+        next_cursor = None
+        if len(rows) == per_page:
+            last = rows[-1]
+            next_cursor = encode_feed_cursor(getattr(last, date_column.key), last.id)
+        return rows, next_cursor
+    
     @measure_time
+    def get_latest_movies_page(self, page: int = 1, per_page: int = 16,
+                               cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get latest movies and the cursor of the following page
+        
+        Args:
+            page: Page number (1-indexed), ignored when cursor is given
+            per_page: Number of items per page
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Tuple of (movie dictionaries, next_cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        if not cursor:
+            snapshot = self._read_feed_snapshot('latest_movies', page, per_page)
+            if snapshot is not None:
+                return snapshot
+        return self._query_latest_movies(page, per_page, cursor)
+    
+    def _query_latest_movies(self, page: int, per_page: int,
+                             cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Latest movies page straight from the movies table"""
+        movies, next_cursor = self._latest_page(
+            Movie, Movie.release_date, page, per_page, cursor, Movie.imdb_id.isnot(None)
+        )
+        return [Movie.card_from_row(row) for row in movies], next_cursor
+    
     def get_latest_movies(self, page: int = 1, per_page: int = 16) -> List[Dict[str, Any]]:
         """
         Get latest movies from database with pagination
@@ -122,14 +318,7 @@ class DatabaseService:
         Returns:
             List of movie dictionaries
         """
-        offset = (page - 1) * per_page
-        movies = self.db.query(Movie)\
-            .filter(Movie.imdb_id.isnot(None))\
-            .order_by(desc(Movie.release_date))\
-            .offset(offset)\
-            .limit(per_page)\
-            .all()
-        return [movie.to_dict() for movie in movies]
+        return self.get_latest_movies_page(page, per_page)[0]
     
     def get_trending_movies(self, per_page: int = 16) -> List[Dict[str, Any]]:
         """
@@ -139,14 +328,22 @@ class DatabaseService:
             per_page: Number of items to return
             
         Returns:
-            List of trending movie dictionaries
+            List of trending movie card dictionaries, with the extra
+            fields the hero banner shows
         """
-        movies = self.db.query(Movie)\
+        snapshot = self._read_feed_snapshot('trending_movies', 1, per_page)
+        if snapshot is not None:
+            return snapshot[0]
+        return self._query_trending_movies(per_page)
+    
+    def _query_trending_movies(self, per_page: int) -> List[Dict[str, Any]]:
+        """Trending movies straight from the movies table"""
+        movies = self.db.query(*Movie.card_columns(hero=True))\
             .filter(Movie.is_trending == True, Movie.imdb_id.isnot(None))\
             .order_by(desc(Movie.popularity))\
             .limit(per_page)\
             .all()
-        return [movie.to_dict() for movie in movies]
+        return [Movie.card_from_row(row) for row in movies]
     
     @measure_time
     def search_movies(self, query: str, page: int = 1, per_page: int = 15) -> List[Dict[str, Any]]:
@@ -160,7 +357,7 @@ class DatabaseService:
             per_page: Number of results per page
             
         Returns:
-            List of matching movie dictionaries
+            List of matching movie card dictionaries
         """
         offset = (page - 1) * per_page
         
@@ -172,8 +369,9 @@ class DatabaseService:
                 fts_query = f'"{fts_query}"*'  # Quoted prefix search
             
             # FTS5 search with prefix matching for autocomplete
-            sql = text("""
-                SELECT m.* FROM movies m
+            columns = ', '.join(f"m.{field}" for field in Movie.CARD_FIELDS)
+            sql = text(f"""
+                SELECT {columns} FROM movies m
                 INNER JOIN movies_fts fts ON m.id = fts.rowid
                 WHERE movies_fts MATCH :query
                 ORDER BY 
@@ -188,23 +386,18 @@ class DatabaseService:
                 'offset': offset
             })
             
-            movies = []
-            for row in result:
-                row_dict = dict(row._mapping)
-                movie = Movie(**row_dict)
-                movies.append(movie.to_dict())
-            return movies
+            return [Movie.card_from_row(row) for row in result]
         except Exception as e:
             logger.warning(f"FTS search failed, falling back to LIKE: {e}")
             # Fallback to LIKE search if FTS fails
             search_term = f"%{query}%"
-            movies = self.db.query(Movie)\
+            movies = self.db.query(*Movie.card_columns())\
                 .filter(Movie.title.ilike(search_term))\
                 .order_by(desc(Movie.popularity))\
                 .offset(offset)\
                 .limit(per_page)\
                 .all()
-            return [movie.to_dict() for movie in movies]
+            return [Movie.card_from_row(row) for row in movies]
     
     # TV Show operations
     def get_tvshow_by_imdb_id(self, imdb_id):
@@ -214,7 +407,53 @@ class DatabaseService:
     def get_tvshow_by_tmdb_id(self, tmdb_id):
         """Get TV show by TMDB ID"""
         return self.db.query(TVShow).filter(TVShow.tmdb_id == tmdb_id).first()
+
+    def _get_media_by_imdb_ids(self, items) -> tuple:
+        """
+        Load the movies and TV shows referenced by My List / watch history rows
+        
+        Args:
+            items: Rows with media_type and media_id (imdb_id) attributes
+            
+        Returns:
+            Tuple of ({imdb_id: Movie}, {imdb_id: TVShow})
+        """
+        movie_ids = {item.media_id for item in items if item.media_type == 'movie'}
+        tvshow_ids = {item.media_id for item in items if item.media_type != 'movie'}
+        return (
+            self._get_by_imdb_ids(Movie, movie_ids),
+            self._get_by_imdb_ids(TVShow, tvshow_ids),
+        )
     
+    def _get_by_imdb_ids(self, model, imdb_ids) -> Dict[str, Any]:
+        """Fetch rows of model keyed by imdb_id, using chunked IN lookups"""
+        imdb_ids = list(imdb_ids)
+        found = {}
+        for start in range(0, len(imdb_ids), IN_CHUNK_SIZE):
+            chunk = imdb_ids[start:start + IN_CHUNK_SIZE]
+            for row in self.db.query(model).filter(model.imdb_id.in_(chunk)).all():
+                found[row.imdb_id] = row
+        return found
+
+    def get_image_paths(self, media_type: str, tmdb_ids: List[int]) -> Dict[int, tuple]:
+        """
+        Resolve poster and backdrop paths for many titles in one query
+
+        Args:
+            media_type: 'movie' or 'tv'
+            tmdb_ids: TMDB IDs to resolve
+
+        Returns:
+            Dictionary mapping tmdb_id to (poster_path, backdrop_path)
+        """
+        if not tmdb_ids:
+            return {}
+        model = Movie if media_type == 'movie' else TVShow
+        rows = self.db.query(model.tmdb_id, model.poster_path, model.backdrop_path)\
+            .filter(model.tmdb_id.in_(set(tmdb_ids)))\
+            .all()
+        return {tmdb_id: (poster_path, backdrop_path) for tmdb_id, poster_path, backdrop_path in rows}
+
     def create_or_update_tvshow(self, tvshow_data):
         """Create or update a TV show"""
         tvshow = self.get_tvshow_by_imdb_id(tvshow_data.get('imdb_id'))
@@ -235,42 +474,69 @@ class DatabaseService:
         return tvshow
     
     def create_or_update_tvshows_batch(self, tvshows_data):
-        """Create or update multiple TV shows in batch"""
-        for tvshow_data in tvshows_data:
-            tvshow = self.get_tvshow_by_imdb_id(tvshow_data.get('imdb_id'))
-            
-            if tvshow:
-                # Update existing TV show
-                for key, value in tvshow_data.items():
-                    if hasattr(tvshow, key):
-                        setattr(tvshow, key, value)
-                tvshow.updated_at = datetime.utcnow()
-            else:
-                # Create new TV show
-                tvshow = TVShow(**tvshow_data)
-                self.db.add(tvshow)
+        """
+        Create or update multiple TV shows in batch
         
-        self.db.commit()
-        return len(tvshows_data)
+        Returns:
+            Dictionary with inserted, updated and unchanged counts
+        """
+        try:
+            return self._bulk_upsert(TVShow, tvshows_data)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Batch TV show operation failed: {e}")
+            raise
+    
+    @measure_time
+    def get_latest_tvshows_page(self, page: int = 1, per_page: int = 16,
+                                cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get latest TV shows and the cursor of the following page
+        
+        Args:
+            page: Page number (1-indexed), ignored when cursor is given
+            per_page: Number of items per page
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Tuple of (TV show dictionaries, next_cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        if not cursor:
+            snapshot = self._read_feed_snapshot('latest_tvshows', page, per_page)
+            if snapshot is not None:
+                return snapshot
+        return self._query_latest_tvshows(page, per_page, cursor)
+    
+    def _query_latest_tvshows(self, page: int, per_page: int,
+                              cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Latest TV shows page straight from the tvshows table"""
+        tvshows, next_cursor = self._latest_page(
+            TVShow, TVShow.first_air_date, page, per_page, cursor
+        )
+        return [TVShow.card_from_row(row) for row in tvshows], next_cursor
     
     def get_latest_tvshows(self, page=1, per_page=16):
         """Get latest TV shows from database"""
-        offset = (page - 1) * per_page
-        tvshows = self.db.query(TVShow)\
-            .order_by(TVShow.first_air_date.desc())\
-            .offset(offset)\
-            .limit(per_page)\
-            .all()
-        return [tvshow.to_dict() for tvshow in tvshows]
+        return self.get_latest_tvshows_page(page, per_page)[0]
     
     def get_trending_tvshows(self, per_page=16):
         """Get trending TV shows from database"""
-        tvshows = self.db.query(TVShow)\
+        snapshot = self._read_feed_snapshot('trending_tvshows', 1, per_page)
+        if snapshot is not None:
+            return snapshot[0]
+        return self._query_trending_tvshows(per_page)
+    
+    def _query_trending_tvshows(self, per_page: int) -> List[Dict[str, Any]]:
+        """Trending TV shows straight from the tvshows table"""
+        tvshows = self.db.query(*TVShow.card_columns())\
             .filter(TVShow.is_trending == True, TVShow.imdb_id.isnot(None))\
             .order_by(TVShow.popularity.desc())\
             .limit(per_page)\
             .all()
-        return [tvshow.to_dict() for tvshow in tvshows]
+        return [TVShow.card_from_row(row) for row in tvshows]
     
     def search_tvshows(self, query, page=1, per_page=15):
         """Search TV shows in database using FTS for ultra-fast results"""
@@ -285,8 +551,9 @@ class DatabaseService:
                 fts_query = f'"{fts_query}"*'  # Quoted prefix search
             
             # FTS5 search with prefix matching for autocomplete
-            sql = text("""
-                SELECT t.* FROM tvshows t
+            columns = ', '.join(f"t.{field}" for field in TVShow.CARD_FIELDS)
+            sql = text(f"""
+                SELECT {columns} FROM tvshows t
                 INNER JOIN tvshows_fts fts ON t.id = fts.rowid
                 WHERE tvshows_fts MATCH :query
                 ORDER BY 
@@ -301,22 +568,17 @@ class DatabaseService:
                 'offset': offset
             })
             
-            tvshows = []
-            for row in result:
-                row_dict = dict(row._mapping)
-                tvshow = TVShow(**row_dict)
-                tvshows.append(tvshow.to_dict())
-            return tvshows
+            return [TVShow.card_from_row(row) for row in result]
         except Exception as e:
             # Fallback to LIKE search if FTS fails
             search_term = f"%{query}%"
-            tvshows = self.db.query(TVShow)\
+            tvshows = self.db.query(*TVShow.card_columns())\
                 .filter(TVShow.title.ilike(search_term))\
                 .order_by(TVShow.popularity.desc())\
                 .offset(offset)\
                 .limit(per_page)\
                 .all()
-            return [tvshow.to_dict() for tvshow in tvshows]
+            return [TVShow.card_from_row(row) for row in tvshows]
     
     def get_total_movies(self):
         """Get total number of movies"""
@@ -334,26 +596,175 @@ class DatabaseService:
         """Check if a TV show exists in the database"""
         return self.db.query(TVShow).filter(TVShow.imdb_id == imdb_id).first() is not None
     
+    def get_existing_imdb_ids(self, media_type: str, imdb_ids) -> set:
+        """
+        Find which of many IMDB IDs are already stored, using chunked IN queries
+        
+        Args:
+            media_type: 'movie' or 'tv'
+            imdb_ids: Iterable of IMDB IDs to check
+            
+        Returns:
+            Set of the given IMDB IDs that exist in the database
+        """
+        model = Movie if media_type == 'movie' else TVShow
+        return self._existing_imdb_ids(model, imdb_ids)
+    
+    def _existing_imdb_ids(self, model, imdb_ids) -> set:
+        """Subset of imdb_ids present in model's table"""
+        imdb_ids = list({imdb_id for imdb_id in imdb_ids if imdb_id})
+        existing = set()
+        for start in range(0, len(imdb_ids), IN_CHUNK_SIZE):
+            chunk = imdb_ids[start:start + IN_CHUNK_SIZE]
+            existing.update(self.db.execute(
+                select(model.imdb_id).where(model.imdb_id.in_(chunk))
+            ).scalars())
+        return existing
+    
     def clear_trending_flags(self, media_type='all'):
         """Clear trending flags for media"""
         if media_type in ['movie', 'all']:
             self.db.query(Movie).update({Movie.is_trending: False})
         if media_type in ['tv', 'all']:
             self.db.query(TVShow).update({TVShow.is_trending: False})
+        self._bump_catalog_version()
         self.db.commit()
     
+    # Feed snapshot operations
+    def write_feed_snapshots(self, pages: int, per_page: int, trending_limit: int) -> int:
+        """
+        Materialize the leading pages of the home feeds into feed_snapshots
+        Replaces the previous snapshot atomically and bumps the catalog version;
+        the pages are stamped with the new version and ignored once it changes
+        
+        Args:
+            pages: Number of latest movies/series pages to store
+            per_page: Items per latest page
+            trending_limit: Items stored for each trending row
+            
+        Returns:
+            Number of snapshot pages written
+        """
+        snapshots = []
+        for feed, query in (('latest_movies', self._query_latest_movies),
+                            ('latest_tvshows', self._query_latest_tvshows)):
+            for page in range(1, pages + 1):
+                items, next_cursor = query(page, per_page)
+                snapshots.append(FeedSnapshot(feed=feed, page=page, per_page=per_page,
+                                              items=items, next_cursor=next_cursor))
+                if not next_cursor:
+                    break
+        snapshots.append(FeedSnapshot(feed='trending_movies', page=1, per_page=trending_limit,
+                                      items=self._query_trending_movies(trending_limit)))
+        snapshots.append(FeedSnapshot(feed='trending_tvshows', page=1, per_page=trending_limit,
+                                      items=self._query_trending_tvshows(trending_limit)))
+        
+        try:
+            self.db.query(FeedSnapshot).delete()
+            version = self._bump_catalog_version()
+            for snapshot in snapshots:
+                snapshot.catalog_version = version
+            self.db.add_all(snapshots)
+            self.db.commit()
+            return len(snapshots)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error writing feed snapshots: {e}")
+            raise
+    
+    def _read_feed_snapshot(self, feed: str, page: int,
+                            per_page: int) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Get a snapshot page if one exists for this page size and was built
+        from the current catalog version (so its cursor is still valid)
+        
+        Returns:
+            Tuple of (card dictionaries, next_cursor) or None to query live
+        """
+        current_version = select(CatalogState.version)\
+            .where(CatalogState.key == CATALOG_KEY).scalar_subquery()
+        row = self.db.execute(
+            select(FeedSnapshot.items, FeedSnapshot.next_cursor, FeedSnapshot.per_page)
+            .where(FeedSnapshot.feed == feed, FeedSnapshot.page == page,
+                   FeedSnapshot.catalog_version == current_version)
+        ).first()
+        if row is None:
+            return None
+        if feed.startswith('trending'):
+            # Trending rows are a single list; any shorter prefix is valid
+            return (row.items[:per_page], None) if per_page <= row.per_page else None
+        if row.per_page != per_page:
+            return None
+        return row.items, row.next_cursor
+    
+    # TMDB document operations
+    def get_tmdb_document(self, cache_key: str) -> Optional[Tuple[Any, datetime]]:
+        """
+        Get a persisted TMDB response
+        
+        Returns:
+            Tuple of (payload, fetched_at) or None if never stored
+        """
+        row = self.db.execute(
+            select(TMDBDocument.payload, TMDBDocument.fetched_at)
+            .where(TMDBDocument.cache_key == cache_key)
+        ).first()
+        return (row.payload, row.fetched_at) if row else None
+    
+    def save_tmdb_document(self, cache_key: str, path: str, payload: Any):
+        """Insert or replace a persisted TMDB response"""
+        try:
+            self.db.merge(TMDBDocument(cache_key=cache_key, path=path, payload=payload,
+                                       fetched_at=datetime.utcnow()))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving TMDB document {path}: {e}")
+            raise
+    
+    # Catalog version operations
+    def get_catalog_version(self) -> int:
+        """Get the current catalog version stamp (0 if never bumped)"""
+        version = self.db.execute(
+            select(CatalogState.version).where(CatalogState.key == CATALOG_KEY)
+        ).scalar()
+        return version or 0
+    
+    def bump_catalog_version(self) -> int:
+        """Mark the catalog as changed and return the new version"""
+        try:
+            version = self._bump_catalog_version()
+            self.db.commit()
+            return version
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error bumping catalog version: {e}")
+            raise
+    
+    def _bump_catalog_version(self) -> int:
+        """Increment the catalog version within the current transaction"""
+        updated = self.db.query(CatalogState)\
+            .filter(CatalogState.key == CATALOG_KEY)\
+            .update({CatalogState.version: CatalogState.version + 1,
+                     CatalogState.updated_at: datetime.utcnow()})
+        if not updated:
+            self.db.add(CatalogState(key=CATALOG_KEY, version=1))
+            self.db.flush()
+        return self.get_catalog_version()
+    
     # My List operations
     def get_my_list(self):
         """Get all items in My List"""
         items = self.db.query(MyList).order_by(MyList.created_at.desc()).all()
+        movies, tvshows = self._get_media_by_imdb_ids(items)
         result = []
         
         for item in items:
             # Get the actual movie or TV show data
             if item.media_type == 'movie':
-                media_item = self.get_movie_by_imdb_id(item.media_id)
+                media_item = movies.get(item.media_id)
             else:  # 'series'
-                media_item = self.get_tvshow_by_imdb_id(item.media_id)
+                media_item = tvshows.get(item.media_id)
             
             if media_item:
                 # Get the full item data
@@ -790,6 +1201,7 @@ class DatabaseService:
             query = query.filter(WatchedItems.media_type == media_type)
         
         watched = query.order_by(desc(WatchedItems.marked_at)).limit(limit).all()
+        movies, tvshows = self._get_media_by_imdb_ids(watched)
         
         result = []
         for item in watched:
@@ -797,14 +1209,14 @@ class DatabaseService:
             
             # Enrich with media details
             if item.media_type == 'movie':
-                media = self.get_movie_by_imdb_id(item.media_id)
+                media = movies.get(item.media_id)
                 if media:
                     watched_dict.update({
                         'poster_url': media.to_dict().get('poster_url'),
                         'backdrop_url': media.to_dict().get('backdrop_url'),
                     })
             else:  # series
-                media = self.get_tvshow_by_imdb_id(item.media_id)
+                media = tvshows.get(item.media_id)
                 if media:
                     watched_dict.update({
                         'poster_url': media.to_dict().get('poster_url'),
@@ -929,26 +1341,30 @@ class DatabaseService:
             .limit(limit)\
             .all()
         
+        movies, tvshows = self._get_media_by_imdb_ids(continue_watching)
+        
         result = []
         for item in continue_watching:
             history_dict = item.to_dict()
             
             # Enrich with media details
             if item.media_type == 'movie':
-                media = self.get_movie_by_imdb_id(item.media_id)
+                media = movies.get(item.media_id)
                 if media:
                     media_dict = media.to_dict()
                     history_dict.update({
                         'poster_url': media_dict.get('poster_url'),
+                        'poster_srcset': media_dict.get('poster_srcset'),
                         'backdrop_url': media_dict.get('backdrop_url'),
                         'overview': media_dict.get('overview'),
                     })
             else:  # series
-                media = self.get_tvshow_by_imdb_id(item.media_id)
+                media = tvshows.get(item.media_id)
                 if media:
                     media_dict = media.to_dict()
                     history_dict.update({
                         'poster_url': media_dict.get('poster_url'),
+                        'poster_srcset': media_dict.get('poster_srcset'),
                         'backdrop_url': media_dict.get('backdrop_url'),
                         'overview': media_dict.get('overview'),
                     })
@@ -52,6 +52,11 @@ def when_ready(server):
     """Called just after the server is started."""
     server.log.info("Homeflix server is ready. Accepting connections.")
 
+def post_fork(server, worker):
+    """Called in each worker after fork; threads started under preload do not survive it."""
+    from utils import cache_sweeper
+    cache_sweeper.start()
+
 def on_exit(server):
     """Called just before exiting Gunicorn."""
     server.log.info("Homeflix server is shutting down...")
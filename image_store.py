@@ -0,0 +1,243 @@
+"""
+Persistent on-disk image store for the poster/backdrop proxies
+Content-addressed files shared by all gunicorn workers, with a size cap and LRU eviction
+"""
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Optional
+from config import image_cache_config
+
+logger = logging.getLogger(__name__)
+
+
+class ImageStore:
+    """
+    Content-addressed disk store for upstream image bytes
+
+    Files are named after the SHA-256 of their upstream URL (TMDB file paths
+    are content-unique) and sharded into two-character sub-directories.
+    A file's mtime doubles as its last-access time so that every worker
+    shares the same LRU order without any coordination.
+    """
+
+    def __init__(self, root: str, max_bytes: int, evict_target: float = 0.9):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.evict_target = evict_target
+        self._lock = threading.Lock()
+        # Approximate size of the store, refreshed by a full scan periodically
+        # so that writes made by other workers are accounted for as well
+        self._approx_bytes: Optional[int] = None
+        self._bytes_since_scan = 0
+        # Scans and eviction run on a per-process daemon thread, never on
+        # the request thread that committed the image
+        self._maintenance_due = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._maintenance_pid: Optional[int] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path_for(self, url: str) -> str:
+        """Map an upstream URL to its location in the store"""
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        ext = os.path.splitext(url)[1].lower() or '.jpg'
+        return os.path.join(self.root, digest[:2], f"{digest}{ext}")
+
+    def contains(self, url: str) -> bool:
+        """Check whether an image is stored without touching its LRU position"""
+        return os.path.exists(self._path_for(url))
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get the local path of a stored image and mark it as recently used
+
+        Returns:
+            Absolute file path or None if the image is not stored
+        """
+        path = self._path_for(url)
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not touch cached image {path}: {e}")
+        return path
+
+    def put(self, url: str, content: bytes) -> str:
+        """
+        Store image bytes atomically and return the local path
+
+        Args:
+            url: Upstream image URL
+            content: Raw image bytes
+        """
+        writer = self.writer(url)
+        try:
+            writer.write(content)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def writer(self, url: str) -> 'ImageWriter':
+        """Open an incremental writer for streaming an image into the store"""
+        return ImageWriter(self, url)
+
+    def _account(self, added_bytes: int):
+        """Track bytes written and schedule a rescan or eviction when one is due"""
+        with self._lock:
+            self._bytes_since_scan += added_bytes
+            if self._approx_bytes is not None:
+                self._approx_bytes += added_bytes
+            due = (self._approx_bytes is None
+                   or self._bytes_since_scan > self.max_bytes // 20
+                   or self._approx_bytes > self.max_bytes)
+
+        if due:
+            self._schedule_maintenance()
+
+    def _schedule_maintenance(self):
+        """Wake the maintenance thread, starting it in this process if needed"""
+        with self._lock:
+            pid = os.getpid()
+            thread = self._maintenance_thread
+            # A forked worker inherits the attribute but not the thread
+            if self._maintenance_pid != pid or thread is None or not thread.is_alive():
+                self._maintenance_due = threading.Event()
+                self._maintenance_pid = pid
+                self._maintenance_thread = threading.Thread(
+                    target=self._maintain, name='image-store-eviction', daemon=True
+                )
+                self._maintenance_thread.start()
+            self._maintenance_due.set()
+
+    def _maintain(self):
+        """Rescan the store and evict whenever _account() asks for it"""
+        due = self._maintenance_due
+        while True:
+            due.wait()
+            due.clear()
+            try:
+                self.evict()
+            except Exception as e:
+                logger.warning(f"Image store eviction failed: {e}")
+
+    def _scan(self):
+        """List (mtime, size, path) for every stored image"""
+        entries = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self) -> int:
+        """Get the total size of the store in bytes"""
+        return sum(size for _, size, _ in self._scan())
+
+    def count(self) -> int:
+        """Get the number of stored images"""
+        return len(self._scan())
+
+    def evict(self):
+        """Remove least recently used images until the store fits its target size"""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * self.evict_target)
+
+        if total > self.max_bytes:
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except FileNotFoundError:
+                    # Another worker evicted it first
+                    total -= size
+                except OSError as e:
+                    logger.warning(f"Could not evict cached image {path}: {e}")
+            logger.info(f"Evicted {removed} images from image store ({total} bytes remain)")
+
+        with self._lock:
+            self._approx_bytes = total
+            self._bytes_since_scan = 0
+
+    def clear(self):
+        """Remove every stored image"""
+        for _, _, path in self._scan():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._approx_bytes = 0
+
+
+class ImageWriter:
+    """
+    Incremental writer for one image
+
+    Chunks go to a temp file in the target shard directory; commit() renames it
+    over the final name so concurrent readers never see a partial image.
+    """
+
+    def __init__(self, store: ImageStore, url: str):
+        self.store = store
+        self.path = store._path_for(url)
+        self.bytes_written = 0
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+        self._done = False
+
+    def write(self, chunk: bytes):
+        """Append a chunk of image bytes"""
+        self._file.write(chunk)
+        self.bytes_written += len(chunk)
+
+    def commit(self) -> str:
+        """Publish the image in the store and return its local path"""
+        if self._done:
+            return self.path
+        self._file.close()
+        try:
+            os.replace(self._tmp_path, self.path)
+        except Exception:
+            self.abort()
+            raise
+        self._done = True
+        self.store._account(self.bytes_written)
+        return self.path
+
+    def abort(self):
+        """Discard a partially written image; a no-op after commit()"""
+        if self._done:
+            return
+        self._done = True
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+# Global image store instance
+image_store = ImageStore(
+    image_cache_config.DIR,
+    image_cache_config.MAX_BYTES,
+    image_cache_config.EVICT_TARGET,
+)
@@ -1,13 +1,16 @@
 from flask import Flask, render_template, request, Response, send_file, send_from_directory, abort, redirect, jsonify
 import requests
-import io
+import hashlib
 import logging
+import queue
+import threading
 from database import init_db
 from db_service import DatabaseService
-from config import api_config, cache_config, server_config, pagination_config, get_embed_sources
-from utils import cache_manager, make_api_request, measure_time
-from functools import lru_cache
-from typing import List, Dict, Any, Optional
+from config import api_config, cache_config, server_config, pagination_config, get_embed_sources, get_image_srcset
+from utils import cache_manager, cache_sweeper, measure_time, SingleFlight
+from tmdb_client import tmdb_client
+from image_store import image_store
+from typing import List, Dict, Any, Optional, Callable
 from urllib.parse import urlparse
 
 # Configure logging
@@ -25,6 +28,9 @@ log.setLevel(logging.ERROR)
 # Initialize database on startup
 init_db()
 
+# Expire cache entries in the background (gunicorn restarts this in each worker)
+cache_sweeper.start()
+
 # Register monitoring routes
 try:
     from monitoring import register_monitoring_routes
@@ -33,46 +39,25 @@ try:
 except ImportError:
     logger.warning("Monitoring module not available - health check endpoints disabled")
 
-@lru_cache(maxsize=1000)
-def get_cached_tmdb_data(url: str, params_str: str = "") -> Dict[str, Any]:
-    """
-    Get data from cache or fetch from TMDB with LRU cache decorator
-    
-    Args:
-        url: TMDB API endpoint URL
-        params_str: Stringified params for cache key
-        
-    Returns:
-        JSON response as dictionary
-    """
-    cache_key = f"{url}_{params_str}"
-    
-    # Try to get from timed cache first
-    cached_data = cache_manager.get('tmdb', cache_key, cache_config.TMDB_DATA)
-    if cached_data is not None:
-        return cached_data
-    
-    # Fetch from API
-    headers = {'Authorization': f'Bearer {api_config.TMDB_ACCESS_TOKEN}'}
-    # Parse params_str safely (it's always from str(dict) in this codebase)
-    import json
-    try:
-        params = json.loads(params_str.replace("'", '"')) if params_str else None
-    except (json.JSONDecodeError, ValueError):
-        params = None
-    
-    try:
-        data = make_api_request(url, headers=headers, params=params)
-        cache_manager.set('tmdb', cache_key, data)
-        return data
-    except Exception as e:
-        logger.error(f"Error fetching TMDB data from {url}: {e}")
-        return {}
+# Coalesce concurrent identical upstream fetches within this worker
+tmdb_flight = SingleFlight()
+image_flight = SingleFlight()
+
+# Session with keep-alive connection pooling for image.tmdb.org
+image_session = requests.Session()
+image_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=api_config.IMAGE_POOL_SIZE,
+    pool_maxsize=api_config.IMAGE_POOL_SIZE
+)
+image_session.mount('http://', image_adapter)
+image_session.mount('https://', image_adapter)
 
 def _populate_image_cache(items: List[Dict[str, Any]], media_type: str):
     """
     Populate poster and backdrop cache from database results
-    Optimized to reduce database queries
+    Cards carry their poster_path/backdrop_path and fill the caches without
+    any query; other items whose paths are not both cached are resolved with
+    one query per media type, however many items are passed in
     
     Args:
         items: List of movie/TV show dictionaries
@@ -81,35 +66,227 @@ def _populate_image_cache(items: List[Dict[str, Any]], media_type: str):
     if not items:
         return
 
-    with DatabaseService() as db_service:
-        for item in items:
-            tmdb_id = item.get('tmdb_id')
-            if not tmdb_id:
-                continue
+    pending = {'movie': set(), 'tv': set()}
+    for item in items:
+        tmdb_id = item.get('tmdb_id')
+        if not tmdb_id:
+            continue
 
-            # For mixed types (My List), determine type from item
-            current_type = media_type
-            if media_type == 'mixed':
-                current_type = 'movie' if item.get('type') == 'movie' else 'tv'
+        # For mixed types (My List), determine type from item
+        current_type = media_type
+        if media_type == 'mixed':
+            current_type = 'movie' if item.get('type') == 'movie' else 'tv'
 
-            # Get the database object to access poster_path and backdrop_path
-            try:
-                if current_type == 'movie':
-                    db_item = db_service.get_movie_by_tmdb_id(tmdb_id)
-                else:
-                    db_item = db_service.get_tvshow_by_tmdb_id(tmdb_id)
+        key = f"{current_type}_{tmdb_id}"
+        if 'poster_path' in item or 'backdrop_path' in item:
+            _cache_image_paths(key, item.get('poster_path'), item.get('backdrop_path'))
+            continue
+        if (cache_manager.get('posters', key, cache_config.POSTER) is not None
+                and cache_manager.get('backdrops', key, cache_config.BACKDROP) is not None):
+            continue
+        pending[current_type].add(tmdb_id)
 
-                if not db_item:
+    if not pending['movie'] and not pending['tv']:
+        return
+
+    try:
+        with DatabaseService() as db_service:
+            for current_type, tmdb_ids in pending.items():
+                if not tmdb_ids:
                     continue
+                paths = db_service.get_image_paths(current_type, list(tmdb_ids))
+                for tmdb_id, (poster_path, backdrop_path) in paths.items():
+                    _cache_image_paths(f"{current_type}_{tmdb_id}", poster_path, backdrop_path)
+    except Exception as e:
+        logger.error(f"Error populating image cache: {e}")
+
+
+def _cache_image_paths(key: str, poster_path: Optional[str], backdrop_path: Optional[str]):
+    """Cache known poster/backdrop paths, skipping writes for unchanged entries"""
+    if poster_path and cache_manager.get('posters', key, cache_config.POSTER) != poster_path:
+        cache_manager.set('posters', key, poster_path)
+    if backdrop_path and cache_manager.get('backdrops', key, cache_config.BACKDROP) != backdrop_path:
+        cache_manager.set('backdrops', key, backdrop_path)
+
+
+IMAGE_ETAG_PREFIX = 'tmdb-'
+
+
+def _image_etag(image_url: str) -> str:
+    """Strong validator for a proxied image, derived from its TMDB file path"""
+    return f"{IMAGE_ETAG_PREFIX}{hashlib.sha1(image_url.encode('utf-8')).hexdigest()}"
+
+
+def _set_image_cache_headers(response: Response, image_url: Optional[str]) -> Response:
+    """Cache a proxied image for IMAGE_MAX_AGE, then revalidate it by ETag.
+
+    The proxy URL only names a title, and the TMDB file behind it can change
+    on the next sync, so the response must not be marked immutable.
+    """
+    if image_url is not None:
+        response.set_etag(_image_etag(image_url))
+    response.cache_control.public = True
+    response.cache_control.max_age = cache_config.IMAGE_MAX_AGE
+    return response
+
+
+def _image_not_modified(image_url: str) -> Optional[Response]:
+    """
+    Answer If-None-Match for a proxied image once its file path is resolved
+
+    Args:
+        image_url: Full image.tmdb.org URL for the title's current file path
+
+    Returns:
+        304 response if the client's copy is current, otherwise None
+    """
+    if not request.if_none_match or not request.if_none_match.contains(_image_etag(image_url)):
+        return None
+
+    return _set_image_cache_headers(Response(status=304), image_url)
+
+
+def _requested_image_size(sizes: tuple, default: str) -> str:
+    """
+    Map the ?size= query parameter to a TMDB size bucket
+
+    Accepts a bucket name (e.g. 'w185', 'original') or a pixel width
+    (e.g. '200'), which is rounded up to the smallest bucket that covers it.
+    """
+    requested = request.args.get('size', '').strip().lower()
+    if requested in sizes:
+        return requested
+
+    width = requested[1:] if requested.startswith('w') else requested
+    if width.isdigit():
+        widths = [size for size in sizes if size != 'original']
+        for size in widths:
+            if int(size[1:]) >= int(width):
+                return size
+        return widths[-1]
+
+    return default
+
+
+def _stream_image(image_url: str,
+                  on_done: Optional[Callable[[Optional[str]], None]] = None) -> Response:
+    """
+    Stream an upstream image to the client while writing it into the image store
+
+    A background thread drains the upstream body into the store at upstream
+    speed and hands chunks to the response, so the image lands on disk (and
+    on_done fires) even if this client reads slowly or disconnects.
+
+    Args:
+        image_url: Full image.tmdb.org URL
+        on_done: Called with the stored path once the image is committed,
+                 or with None if the upstream fetch fails
+
+    Raises:
+        requests.RequestException: If the upstream request fails
+    """
+    upstream = image_session.get(image_url, stream=True, timeout=api_config.REQUEST_TIMEOUT)
+    try:
+        upstream.raise_for_status()
+        writer = image_store.writer(image_url)
+    except Exception:
+        upstream.close()
+        raise
+
+    chunks = queue.Queue()
+
+    def pump():
+        path = None
+        try:
+            for chunk in upstream.iter_content(chunk_size=api_config.IMAGE_CHUNK_SIZE):
+                writer.write(chunk)
+                chunks.put(chunk)
+            path = writer.commit()
+        except Exception as e:
+            logger.warning(f"Error fetching image {image_url}: {e}")
+            writer.abort()
+        finally:
+            upstream.close()
+            chunks.put(None)
+            if on_done:
+                on_done(path)
+
+    threading.Thread(target=pump, name='image-fetch', daemon=True).start()
+
+    def generate():
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    response = Response(generate(), mimetype=upstream.headers.get('content-type', 'image/jpeg'))
+    if 'content-length' in upstream.headers and 'content-encoding' not in upstream.headers:
+        response.headers['Content-Length'] = upstream.headers['content-length']
+    return response
+
+
+def _fetch_image_once(image_url: str):
+    """
+    Fetch an image not yet in the store, coalescing concurrent requests for it
+
+    The first request streams from upstream; concurrent requests for the same
+    URL wait until the upstream body is committed to the store (not until the
+    first client has downloaded it) and are served from disk.
+    Returns a Response, or the local path if another request stored it.
+    """
+    call, is_leader = image_flight.begin(image_url)
+    if is_leader:
+        def on_done(path):
+            image_flight.finish(image_url, call, result=path)
+
+        try:
+            return _stream_image(image_url, on_done)
+        except Exception as e:
+            image_flight.finish(image_url, call, error=e)
+            raise
+
+    try:
+        call.wait(timeout=api_config.REQUEST_TIMEOUT)
+    except Exception:
+        # The leading fetch failed or stalled; try on our own below
+        pass
+
+    local_path = image_store.get(image_url)
+    if local_path is not None:
+        return local_path
+    return _stream_image(image_url)
 
-                # Populate caches
-                if getattr(db_item, 'poster_path', None):
-                    cache_manager.set('posters', f"{current_type}_{tmdb_id}", db_item.poster_path)
 
-                if getattr(db_item, 'backdrop_path', None):
-                    cache_manager.set('backdrops', f"{current_type}_{tmdb_id}", db_item.backdrop_path)
-            except Exception as e:
-                logger.error(f"Error populating cache for {current_type} {tmdb_id}: {e}")
+def _serve_image(image_url: str):
+    """
+    Serve an upstream image from the on-disk store, streaming it in on a miss
+
+    Args:
+        image_url: Full image.tmdb.org URL
+
+    Raises:
+        requests.RequestException: If the upstream fetch fails
+    """
+    not_modified = _image_not_modified(image_url)
+    if not_modified:
+        return not_modified
+
+    local_path = image_store.get(image_url)
+    if local_path is None:
+        fetched = _fetch_image_once(image_url)
+        if isinstance(fetched, Response):
+            return _set_image_cache_headers(fetched, image_url)
+        local_path = fetched
+
+    response = send_file(local_path, etag=False, conditional=False,
+                         max_age=cache_config.IMAGE_MAX_AGE)
+    # The file's mtime tracks LRU access and its name is a store-internal hash;
+    # Cache-Control max-age supersedes Expires
+    response.headers.pop('Last-Modified', None)
+    response.headers.pop('Content-Disposition', None)
+    response.headers.pop('Expires', None)
+    return _set_image_cache_headers(response, image_url)
 
 
 def _allows_framing(headers: Dict[str, str]) -> bool:
@@ -171,76 +348,109 @@ def favicon():
     """Handle favicon requests"""
     return '', 204
 
+# Placeholder for the per-request Continue Watching row in the cached home page
+CONTINUE_WATCHING_SLOT = '<!-- continue-watching-row -->'
+
+
+def _render_home_catalog(db_service: DatabaseService, movie_page: int, series_page: int) -> str:
+    """
+    Render index.html from catalog data only
+    The Continue Watching row is left as CONTINUE_WATCHING_SLOT to be spliced in per request
+    """
+    movies, movie_cursor = db_service.get_latest_movies_page(movie_page, pagination_config.DEFAULT_PER_PAGE)
+    series, series_cursor = db_service.get_latest_tvshows_page(series_page, pagination_config.DEFAULT_PER_PAGE)
+    trending_movies = db_service.get_trending_movies(pagination_config.TRENDING_LIMIT)
+    trending_series = db_service.get_trending_tvshows(pagination_config.TRENDING_LIMIT)
+    
+    # Populate image caches from database results in one pass
+    _populate_image_cache(movies + trending_movies + series + trending_series, 'mixed')
+    
+    # Get backdrop URLs for hero section from trending movies
+    backdrop_urls = []
+    for movie in trending_movies:
+        backdrop_url = movie.get('backdrop_url')
+        if backdrop_url:
+            backdrop_urls.append(backdrop_url)
+    
+    # If not enough backdrops, add from movies
+    if len(backdrop_urls) < 5:
+        for movie in movies:
+            if len(backdrop_urls) >= 10:
+                break
+            backdrop_url = movie.get('backdrop_url')
+            if backdrop_url:
+                backdrop_urls.append(backdrop_url)
+    
+    return render_template('index.html', movies=movies, series=series, 
+                           trending_movies=trending_movies, trending_series=trending_series, 
+                           movie_page=movie_page, series_page=series_page, 
+                           movie_cursor=movie_cursor, series_cursor=series_cursor,
+                           backdrop_urls=backdrop_urls,
+                           continue_watching_row=CONTINUE_WATCHING_SLOT)
+
+
 @app.route('/')
 @measure_time
 def index():
-    """Display all movies and series - optimized with caching"""
+    """
+    Display all movies and series - optimized with caching
+    The catalog part of the page is cached per page numbers until the
+    catalog version changes; Continue Watching is rendered fresh each time
+    """
     movie_page = int(request.args.get('movie_page', 1))
     series_page = int(request.args.get('series_page', 1))
     try:
         # Use database instead of API calls
         with DatabaseService() as db_service:
-            movies = db_service.get_latest_movies(movie_page, pagination_config.DEFAULT_PER_PAGE)
-            series = db_service.get_latest_tvshows(series_page, pagination_config.DEFAULT_PER_PAGE)
-            trending_movies = db_service.get_trending_movies(pagination_config.TRENDING_LIMIT)
-            trending_series = db_service.get_trending_tvshows(pagination_config.TRENDING_LIMIT)
-            my_list = db_service.get_my_list()
+            version = db_service.get_catalog_version()
+            cache_key = f"{movie_page}_{series_page}"
+            cached = cache_manager.get('home_pages', cache_key, cache_config.HOME_PAGE)
+            if cached is not None and cached[0] == version:
+                page_html = cached[1]
+            else:
+                page_html = _render_home_catalog(db_service, movie_page, series_page)
+                cache_manager.set('home_pages', cache_key, (version, page_html))
+            
             continue_watching = db_service.get_continue_watching(limit=10)  # Get continue watching
         
-        # Populate image caches from database results
-        _populate_image_cache(movies, 'movie')
-        _populate_image_cache(series, 'tv')
-        _populate_image_cache(trending_movies, 'movie')
-        _populate_image_cache(trending_series, 'tv')
-        if my_list:
-            _populate_image_cache(my_list, 'mixed')
+        continue_watching_row = ''
         if continue_watching:
             _populate_image_cache(continue_watching, 'mixed')
+            continue_watching_row = render_template('continue_watching_row.html',
+                                                    continue_watching=continue_watching)
         
-        # Get backdrop URLs for hero section from trending movies
-        backdrop_urls = []
-        for movie in trending_movies:
-            backdrop_url = movie.get('backdrop_url')
-            if backdrop_url:
-                backdrop_urls.append(backdrop_url)
-        
-        # If not enough backdrops, add from movies
-        if len(backdrop_urls) < 5:
-            for movie in movies:
-                if len(backdrop_urls) >= 10:
-                    break
-                backdrop_url = movie.get('backdrop_url')
-                if backdrop_url:
-                    backdrop_urls.append(backdrop_url)
-        
-        return render_template('index.html', movies=movies, series=series, 
-                             trending_movies=trending_movies, trending_series=trending_series, 
-                             movie_page=movie_page, series_page=series_page, 
-                             backdrop_urls=backdrop_urls, my_list=my_list, 
-                             continue_watching=continue_watching)
+        return page_html.replace(CONTINUE_WATCHING_SLOT, continue_watching_row, 1)
     except Exception as e:
         logger.error(f"Error in index: {e}")
         return f"Error accessing data: {e}", 500
 
 @app.route('/load_more_movies/<int:page>')
 def load_more_movies(page):
-    """Load more movies for AJAX"""
+    """Load more movies for AJAX, continuing from ?cursor= when given"""
     try:
         with DatabaseService() as db_service:
-            movies = db_service.get_latest_movies(page)
+            movies, next_cursor = db_service.get_latest_movies_page(
+                page, cursor=request.args.get('cursor')
+            )
         _populate_image_cache(movies, 'movie')
-        return {'movies': movies}
+        return {'movies': movies, 'next_cursor': next_cursor}
+    except ValueError as e:
+        return {'error': str(e)}, 400
     except Exception as e:
         return {'error': str(e)}, 500
 
 @app.route('/load_more_series/<int:page>')
 def load_more_series(page):
-    """Load more series for AJAX"""
+    """Load more series for AJAX, continuing from ?cursor= when given"""
     try:
         with DatabaseService() as db_service:
-            series = db_service.get_latest_tvshows(page)
+            series, next_cursor = db_service.get_latest_tvshows_page(
+                page, cursor=request.args.get('cursor')
+            )
         _populate_image_cache(series, 'tv')
-        return {'series': series}
+        return {'series': series, 'next_cursor': next_cursor}
+    except ValueError as e:
+        return {'error': str(e)}, 400
     except Exception as e:
         return {'error': str(e)}, 500
 
@@ -324,10 +534,7 @@ def series_details(imdb_id):
         
         if not series:
             # If not in database, try to fetch from TMDB using IMDB ID
-            find_url = f"{api_config.TMDB_BASE_URL}/find/{imdb_id}"
-            params = {'external_source': 'imdb_id'}
-            params_str = str(params)
-            find_data = get_cached_tmdb_data(find_url, params_str)
+            find_data = tmdb_client.find_by_imdb_id(imdb_id)
             
             tv_results = find_data.get('tv_results', [])
             if not tv_results:
@@ -336,9 +543,8 @@ def series_details(imdb_id):
             # Get the TMDB ID from the results
             tmdb_id = tv_results[0].get('id')
             
-            # Fetch full TV show details
-            tv_url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}"
-            tv_data = get_cached_tmdb_data(tv_url, "")
+            # Fetch full TV show details (reused below for seasons, cast and rating)
+            tv_data = tmdb_client.get_title_details('tv', tmdb_id)
             
             # Create series_dict from TMDB data
             series_dict = {
@@ -360,9 +566,8 @@ def series_details(imdb_id):
         
         # Fetch detailed information from TMDB
         if tmdb_id:
-            # Get full series details
-            url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}"
-            series_data = get_cached_tmdb_data(url, "")
+            # Get full series details with credits and content ratings in one request
+            series_data = tmdb_client.get_title_details('tv', tmdb_id)
             
             # Get seasons information
             seasons = []
@@ -378,13 +583,11 @@ def series_details(imdb_id):
                     })
             
             # Get cast information
-            credits_url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}/credits"
-            credits_data = get_cached_tmdb_data(credits_url, "")
+            credits_data = series_data.get('credits', {})
             cast = credits_data.get('cast', [])[:10]  # Top 10 cast members
             
             # Get content rating
-            content_ratings_url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}/content_ratings"
-            ratings_data = get_cached_tmdb_data(content_ratings_url, "")
+            ratings_data = series_data.get('content_ratings', {})
             rating = 'TV-MA'  # default
             for item in ratings_data.get('results', []):
                 if item.get('iso_3166_1') == 'US':
@@ -423,14 +626,11 @@ def movie_details(imdb_id):
         
         # Fetch detailed information from TMDB
         if tmdb_id:
-            # Get full movie details
-            url = f"{api_config.TMDB_BASE_URL}/movie/{tmdb_id}"
-            headers = {'Authorization': f'Bearer {api_config.TMDB_ACCESS_TOKEN}'}
-            movie_data = get_cached_tmdb_data(url, "")
+            # Get full movie details with credits and release dates in one request
+            movie_data = tmdb_client.get_title_details('movie', tmdb_id)
             
             # Get cast information
-            credits_url = f"{api_config.TMDB_BASE_URL}/movie/{tmdb_id}/credits"
-            credits_data = get_cached_tmdb_data(credits_url, "")
+            credits_data = movie_data.get('credits', {})
             cast = credits_data.get('cast', [])[:10]  # Top 10 cast members
             crew = credits_data.get('crew', [])
             
@@ -438,8 +638,7 @@ def movie_details(imdb_id):
             director = next((person for person in crew if person.get('job') == 'Director'), None)
             
             # Get content rating
-            releases_url = f"{api_config.TMDB_BASE_URL}/movie/{tmdb_id}/release_dates"
-            releases_data = get_cached_tmdb_data(releases_url, "")
+            releases_data = movie_data.get('release_dates', {})
             rating = 'NR'  # default
             for country in releases_data.get('results', []):
                 if country.get('iso_3166_1') == 'US':
@@ -473,10 +672,7 @@ def season_episodes(imdb_id, season_number):
         
         if not series:
             # If not in database, try to fetch from TMDB using IMDB ID
-            find_url = f"{api_config.TMDB_BASE_URL}/find/{imdb_id}"
-            params = {'external_source': 'imdb_id'}
-            params_str = str(params)
-            find_data = get_cached_tmdb_data(find_url, params_str)
+            find_data = tmdb_client.find_by_imdb_id(imdb_id)
             
             tv_results = find_data.get('tv_results', [])
             if not tv_results:
@@ -490,8 +686,7 @@ def season_episodes(imdb_id, season_number):
         
         # Fetch season details from TMDB
         if tmdb_id:
-            url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}/season/{season_number}"
-            season_data = get_cached_tmdb_data(url, "")
+            season_data = tmdb_client.get(f"/tv/{tmdb_id}/season/{season_number}")
             
             episodes = []
             for ep_data in season_data.get('episodes', []):
@@ -542,10 +737,7 @@ def watch_episode(imdb_id, season_number, episode_number):
         
         if not series:
             # If not in database, try to fetch from TMDB using IMDB ID
-            find_url = f"{api_config.TMDB_BASE_URL}/find/{imdb_id}"
-            params = {'external_source': 'imdb_id'}
-            params_str = str(params)
-            find_data = get_cached_tmdb_data(find_url, params_str)
+            find_data = tmdb_client.find_by_imdb_id(imdb_id)
             
             tv_results = find_data.get('tv_results', [])
             if not tv_results:
@@ -587,18 +779,78 @@ def serve_css(filename):
         logger.error(f"Error serving CSS {filename}: {e}")
         abort(404)
 
+def _image_placeholder(kind: str, label: str, max_age: int = 0) -> Response:
+    """
+    SVG placeholder served in place of a missing poster or backdrop
+
+    Args:
+        kind: 'poster' or 'backdrop'
+        label: Text shown in the placeholder
+        max_age: Browser cache lifetime in seconds (0 to leave uncached)
+    """
+    if kind == 'poster':
+        width, height, font_size = 300, 450, 20
+    else:
+        width, height, font_size = 500, 281, 16
+    svg = f'''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
+    <rect width="{width}" height="{height}" fill="#333"/>
+    <text x="{width // 2}" y="{height // 2}" text-anchor="middle" fill="white" font-size="{font_size}">{label}</text>
+    </svg>'''
+    response = Response(svg, mimetype='image/svg+xml')
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
+def _known_image_miss(kind: str, key: str, path_known: bool) -> Optional[Response]:
+    """
+    Placeholder for an image recorded in the negative cache, without DB or network work
+
+    Upstream failures are honoured even when the file path is known; "no image"
+    misses only apply while the path is still unknown.
+    """
+    negative_key = f"{kind}_{key}"
+    label = cache_manager.get('failed_images', negative_key, cache_config.FAILED_IMAGE)
+    max_age = cache_config.FAILED_IMAGE
+    if label is None and not path_known:
+        label = cache_manager.get('missing_images', negative_key, cache_config.MISSING_IMAGE)
+        max_age = cache_config.MISSING_IMAGE
+    if label is None:
+        return None
+    return _image_placeholder(kind, label, max_age)
+
+
+def _record_image_miss(kind: str, key: str, label: str, upstream_error: bool = False) -> Response:
+    """
+    Remember a missing image or an upstream failure and return its placeholder
+
+    Args:
+        kind: 'poster' or 'backdrop'
+        key: '<media_type>_<tmdb_id>'
+        label: Text shown in the placeholder
+        upstream_error: True for transient failures, which expire sooner
+    """
+    if upstream_error:
+        cache_manager.set('failed_images', f"{kind}_{key}", label)
+        return _image_placeholder(kind, label, cache_config.FAILED_IMAGE)
+    cache_manager.set('missing_images', f"{kind}_{key}", label)
+    return _image_placeholder(kind, label, cache_config.MISSING_IMAGE)
+
+
 @app.route('/poster/<media_type>/<int:tmdb_id>')
 def get_poster(media_type, tmdb_id):
-    """Serve poster image with caching"""
+    """Serve poster image with caching, at the TMDB size picked by ?size="""
     if not api_config.TMDB_ACCESS_TOKEN:
-        svg = '''<svg width="300" height="450" xmlns="http://www.w3.org/2000/svg">
-        <rect width="300" height="450" fill="#333"/>
-        <text x="150" y="225" text-anchor="middle" fill="white" font-size="20">No Poster</text>
-        </svg>'''
-        return Response(svg, mimetype='image/svg+xml')
+        return _image_placeholder('poster', 'No Poster')
     
     key = f"{media_type}_{tmdb_id}"
     poster_path = cache_manager.get('posters', key, cache_config.POSTER)
+    size = _requested_image_size(api_config.POSTER_SIZES, api_config.DEFAULT_POSTER_SIZE)
+    
+    known_miss = _known_image_miss('poster', key, path_known=bool(poster_path))
+    if known_miss:
+        return known_miss
     
     # If not in cache, try to get from database
     if not poster_path:
@@ -614,35 +866,31 @@ def get_poster(media_type, tmdb_id):
                     cache_manager.set('posters', key, poster_path)
         except Exception as e:
             logger.error(f"Error fetching poster from database: {e}")
+            return _image_placeholder('poster', 'No Poster')
     
     if not poster_path:
-        abort(404)
+        return _record_image_miss('poster', key, 'No Poster')
     
     try:
-        image_url = f"{api_config.TMDB_IMAGE_BASE_URL}{poster_path}"
-        image_response = requests.get(image_url, timeout=api_config.REQUEST_TIMEOUT)
-        image_response.raise_for_status()
-        
-        return send_file(
-            io.BytesIO(image_response.content),
-            mimetype=image_response.headers.get('content-type', 'image/jpeg')
-        )
+        image_url = f"{api_config.TMDB_IMAGE_HOST}/{size}{poster_path}"
+        return _serve_image(image_url)
     except Exception as e:
         logger.error(f"Error proxying poster: {e}")
-        abort(404)
+        return _record_image_miss('poster', key, 'Poster Unavailable', upstream_error=True)
 
 @app.route('/backdrop/<media_type>/<int:tmdb_id>')
 def get_backdrop(media_type, tmdb_id):
-    """Serve backdrop image with caching"""
+    """Serve backdrop image with caching, at the TMDB size picked by ?size="""
     if not api_config.TMDB_ACCESS_TOKEN:
-        svg = '''<svg width="500" height="281" xmlns="http://www.w3.org/2000/svg">
-        <rect width="500" height="281" fill="#333"/>
-        <text x="250" y="140" text-anchor="middle" fill="white" font-size="20">No Backdrop</text>
-        </svg>'''
-        return Response(svg, mimetype='image/svg+xml')
+        return _image_placeholder('backdrop', 'No Backdrop')
     
     key = f"{media_type}_{tmdb_id}"
     backdrop_path = cache_manager.get('backdrops', key, cache_config.BACKDROP)
+    size = _requested_image_size(api_config.BACKDROP_SIZES, api_config.DEFAULT_BACKDROP_SIZE)
+    
+    known_miss = _known_image_miss('backdrop', key, path_known=bool(backdrop_path))
+    if known_miss:
+        return known_miss
     
     # If not in cache, try to get from database first
     if not backdrop_path:
@@ -662,12 +910,8 @@ def get_backdrop(media_type, tmdb_id):
     # If still not found, try to fetch from TMDB API
     if not backdrop_path:
         try:
-            headers = {
-                "Authorization": f"Bearer {api_config.TMDB_ACCESS_TOKEN}",
-                "accept": "application/json"
-            }
-            tmdb_url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}"
-            response = requests.get(tmdb_url, headers=headers, timeout=api_config.REQUEST_TIMEOUT)
+            tmdb_path = f"/{media_type}/{tmdb_id}"
+            response = tmdb_flight.do(tmdb_path, tmdb_client.request, tmdb_path)
             
             if response.ok:
                 data = response.json()
@@ -679,53 +923,33 @@ def get_backdrop(media_type, tmdb_id):
                 else:
                     # No backdrop available, return placeholder
                     logger.warning(f"No backdrop available for {media_type}/{tmdb_id}")
-                    svg = '''<svg width="500" height="281" xmlns="http://www.w3.org/2000/svg">
-                    <rect width="500" height="281" fill="#333"/>
-                    <text x="250" y="140" text-anchor="middle" fill="white" font-size="16">No Backdrop Available</text>
-                    </svg>'''
-                    return Response(svg, mimetype='image/svg+xml')
+                    return _record_image_miss('backdrop', key, 'No Backdrop Available')
+            elif response.status_code == 404:
+                # Unknown title on TMDB, treat like a missing backdrop
+                logger.warning(f"TMDB has no {media_type}/{tmdb_id}")
+                return _record_image_miss('backdrop', key, 'No Backdrop Available')
             else:
                 # TMDB API error, return placeholder
                 logger.warning(f"TMDB API error for {media_type}/{tmdb_id}: {response.status_code}")
-                svg = '''<svg width="500" height="281" xmlns="http://www.w3.org/2000/svg">
-                <rect width="500" height="281" fill="#333"/>
-                <text x="250" y="140" text-anchor="middle" fill="white" font-size="16">Backdrop Unavailable</text>
-                </svg>'''
-                return Response(svg, mimetype='image/svg+xml')
+                return _record_image_miss('backdrop', key, 'Backdrop Unavailable', upstream_error=True)
         except Exception as e:
             logger.error(f"Error fetching backdrop metadata from TMDB: {e}")
             # Return placeholder instead of aborting
-            svg = '''<svg width="500" height="281" xmlns="http://www.w3.org/2000/svg">
-            <rect width="500" height="281" fill="#333"/>
-            <text x="250" y="140" text-anchor="middle" fill="white" font-size="16">Backdrop Error</text>
-            </svg>'''
-            return Response(svg, mimetype='image/svg+xml')
+            return _record_image_miss('backdrop', key, 'Backdrop Error', upstream_error=True)
     
     # Now fetch the actual image
     try:
-        image_url = f"{api_config.TMDB_BACKDROP_BASE_URL}{backdrop_path}"
-        image_response = requests.get(image_url, timeout=api_config.REQUEST_TIMEOUT)
-        image_response.raise_for_status()
-        
-        return send_file(
-            io.BytesIO(image_response.content),
-            mimetype=image_response.headers.get('content-type', 'image/jpeg')
-        )
+        image_url = f"{api_config.TMDB_IMAGE_HOST}/{size}{backdrop_path}"
+        return _serve_image(image_url)
     except Exception as e:
         logger.error(f"Error proxying backdrop image for {media_type}/{tmdb_id}: {e}")
         # Return placeholder instead of aborting
-        svg = '''<svg width="500" height="281" xmlns="http://www.w3.org/2000/svg">
-        <rect width="500" height="281" fill="#333"/>
-        <text x="250" y="140" text-anchor="middle" fill="white" font-size="16">Image Unavailable</text>
-        </svg>'''
-        return Response(svg, mimetype='image/svg+xml')
+        return _record_image_miss('backdrop', key, 'Image Unavailable', upstream_error=True)
 
 def search_tmdb_movies(query, page=1):
     """Search movies using TMDB API"""
     try:
-        url = f"{api_config.TMDB_BASE_URL}/search/movie"
-        params = {'query': query, 'page': page}
-        data = get_cached_tmdb_data(url, str(params))
+        data = tmdb_client.get("/search/movie", {'query': query, 'page': page})
         movies = data.get('results', [])[:15]  # Limit to 15
         filtered_movies = []
         for movie in movies:
@@ -736,6 +960,7 @@ def search_tmdb_movies(query, page=1):
                 movie['imdb_id'] = imdb_id
                 # Build poster URL directly
                 movie['poster_url'] = f"/poster/movie/{movie['tmdb_id']}"
+                movie['poster_srcset'] = get_image_srcset('poster', 'movie', movie['tmdb_id'])
                 movie['backdrop_url'] = f"/backdrop/movie/{movie['tmdb_id']}" if movie.get('backdrop_path') else None
                 movie['quality'] = 'HD'  # Default
                 # Cache the poster path if available
@@ -752,9 +977,7 @@ def search_tmdb_movies(query, page=1):
 def search_tmdb_series(query, page=1):
     """Search TV series using TMDB API"""
     try:
-        url = f"{api_config.TMDB_BASE_URL}/search/tv"
-        params = {'query': query, 'page': page}
-        data = get_cached_tmdb_data(url, str(params))
+        data = tmdb_client.get("/search/tv", {'query': query, 'page': page})
         series = data.get('results', [])[:15]  # Limit to 15
         filtered_series = []
         for show in series:
@@ -765,6 +988,7 @@ def search_tmdb_series(query, page=1):
                 show['imdb_id'] = imdb_id
                 # Build poster URL directly
                 show['poster_url'] = f"/poster/tv/{show['tmdb_id']}"
+                show['poster_srcset'] = get_image_srcset('poster', 'tv', show['tmdb_id'])
                 show['backdrop_url'] = f"/backdrop/tv/{show['tmdb_id']}" if show.get('backdrop_path') else None
                 # Cache the poster path if available
                 if show.get('poster_path'):
@@ -777,10 +1001,9 @@ def search_tmdb_series(query, page=1):
         logger.error(f" searching TMDB series: {e}")
         return []
 
-@lru_cache(maxsize=500)
 def get_imdb_id(tmdb_id: int, media_type: str) -> Optional[str]:
     """
-    Get IMDB ID from TMDB ID with caching
+    Get IMDB ID from TMDB ID, through the TTL'd TMDB client cache
     
     Args:
         tmdb_id: TMDB ID
@@ -790,37 +1013,15 @@ def get_imdb_id(tmdb_id: int, media_type: str) -> Optional[str]:
         IMDB ID or None if not found
     """
     try:
-        url = f"{api_config.TMDB_BASE_URL}/{media_type}/{tmdb_id}/external_ids"
-        data = get_cached_tmdb_data(url, "")
+        data = tmdb_client.get(f"/{media_type}/{tmdb_id}/external_ids")
         return data.get('imdb_id')
     except Exception as e:
         logger.error(f"Error getting IMDB ID for {tmdb_id}: {e}")
         return None
 
-@lru_cache(maxsize=500)
-def get_imdb_id(tmdb_id: int, media_type: str) -> Optional[str]:
-    """
-    Get IMDB ID from TMDB ID with caching
-    
-    Args:
-        tmdb_id: TMDB ID
-        media_type: 'movie' or 'tv'
-        
-    Returns:
-        IMDB ID or None if not found
-    """
-    try:
-        url = f"{api_config.TMDB_BASE_URL}/{media_type}/{tmdb_id}/external_ids"
-        data = get_cached_tmdb_data(url, "")
-        return data.get('imdb_id')
-    except Exception as e:
-        logger.error(f"Error getting IMDB ID for {tmdb_id}: {e}")
-        return None
-
-@lru_cache(maxsize=200)
 def get_movie_details(imdb_id: str) -> Optional[Dict[str, Any]]:
     """
-    Get movie details from TMDB by IMDB ID with caching
+    Get movie details from TMDB by IMDB ID, through the TTL'd TMDB client cache
     
     Args:
         imdb_id: IMDB ID
@@ -829,9 +1030,7 @@ def get_movie_details(imdb_id: str) -> Optional[Dict[str, Any]]:
         Movie details dictionary or None
     """
     try:
-        url = f"{api_config.TMDB_BASE_URL}/find/{imdb_id}"
-        params_str = str({'external_source': 'imdb_id'})
-        data = get_cached_tmdb_data(url, params_str)
+        data = tmdb_client.find_by_imdb_id(imdb_id)
         
         if data.get('movie_results'):
             movie = data['movie_results'][0]
@@ -843,10 +1042,9 @@ def get_movie_details(imdb_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-@lru_cache(maxsize=200)
 def get_series_details(imdb_id: str) -> Optional[Dict[str, Any]]:
     """
-    Get series details from TMDB by IMDB ID with caching
+    Get series details from TMDB by IMDB ID, through the TTL'd TMDB client cache
     
     Args:
         imdb_id: IMDB ID
@@ -855,9 +1053,7 @@ def get_series_details(imdb_id: str) -> Optional[Dict[str, Any]]:
         Series details dictionary or None
     """
     try:
-        url = f"{api_config.TMDB_BASE_URL}/find/{imdb_id}"
-        params_str = str({'external_source': 'imdb_id'})
-        data = get_cached_tmdb_data(url, params_str)
+        data = tmdb_client.find_by_imdb_id(imdb_id)
         
         if data.get('tv_results'):
             series = data['tv_results'][0]
@@ -868,6 +1064,7 @@ def get_series_details(imdb_id: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Error getting series details for {imdb_id}: {e}")
         return None
 
+
 @app.route('/api/next_episode/<imdb_id>/<int:season>/<int:episode>')
 def get_next_episode(imdb_id, season, episode):
     """Get next episode information for series"""
@@ -882,8 +1079,7 @@ def get_next_episode(imdb_id, season, episode):
             return jsonify({'has_next': False})
         
         # Get season details to check episode count
-        url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}/season/{season}"
-        season_data = get_cached_tmdb_data(url, "")
+        season_data = tmdb_client.get(f"/tv/{tmdb_id}/season/{season}")
         
         total_episodes = len(season_data.get('episodes', []))
         next_episode = episode + 1
@@ -906,8 +1102,7 @@ def get_next_episode(imdb_id, season, episode):
             # Check if there's a next season
             next_season = season + 1
             try:
-                url = f"{api_config.TMDB_BASE_URL}/tv/{tmdb_id}/season/{next_season}"
-                next_season_data = get_cached_tmdb_data(url, "")
+                next_season_data = tmdb_client.get(f"/tv/{tmdb_id}/season/{next_season}")
                 
                 if next_season_data.get('episodes'):
                     first_episode = next_season_data['episodes'][0]
@@ -956,7 +1151,7 @@ def search_suggestions():
                 'title': movie.get('title'),
                 'type': 'movie',
                 'year': movie.get('release_date', '')[:4] if movie.get('release_date') else '',
-                'poster_url': movie.get('poster_url'),
+                'poster_url': f"{movie['poster_url']}?size=w92" if movie.get('poster_url') else None,
                 'url': f"/movie/{movie.get('imdb_id')}"
             })
         
@@ -967,7 +1162,7 @@ def search_suggestions():
                 'title': show.get('title'),
                 'type': 'series',
                 'year': show.get('first_air_date', '')[:4] if show.get('first_air_date') else '',
-                'poster_url': show.get('poster_url'),
+                'poster_url': f"{show['poster_url']}?size=w92" if show.get('poster_url') else None,
                 'url': f"/series/{show.get('imdb_id')}"
             })
         
@@ -6,7 +6,8 @@ from flask import jsonify
 import psutil
 import time
 from datetime import datetime
-from utils import cache_manager
+from utils import cache_manager, cache_sweeper, tmdb_rate_limiter
+from tmdb_client import tmdb_client
 
 # Store startup time
 startup_time = time.time()
@@ -36,6 +37,14 @@ def get_cache_stats():
         'tmdb_cache_size': cache_manager.size('tmdb'),
         'posters_cache_size': cache_manager.size('posters'),
         'backdrops_cache_size': cache_manager.size('backdrops'),
+        'missing_images_cache_size': cache_manager.size('missing_images'),
+        'failed_images_cache_size': cache_manager.size('failed_images'),
+        'home_pages_cache_size': cache_manager.size('home_pages'),
+        'memory': cache_manager.memory_stats(),
+        'sweeper': cache_sweeper.stats(),
+        # Counters are per worker process, since it started
+        'namespaces': cache_manager.counter_stats(),
+        'tmdb_stale_while_revalidate': tmdb_client.stats(),
     }
 
 
@@ -76,6 +85,7 @@ def register_monitoring_routes(app):
                 'uptime': uptime,
                 'system': system_stats,
                 'cache': cache_stats,
+                'tmdb_rate_limit': tmdb_rate_limiter.stats(),
             })
         except Exception as e:
             return jsonify({
@@ -3,12 +3,22 @@
 let moviePage = 1;
 let seriesPage = 1;
 let searchQuery = '';
+// Keyset cursors for the latest feeds; null falls back to page numbers
+let movieCursor = null;
+let seriesCursor = null;
 
 // Initialize pagination data
-function initializePaginationData(movie_page, series_page, search_query) {
+function initializePaginationData(movie_page, series_page, search_query, movie_cursor, series_cursor) {
     moviePage = movie_page;
     seriesPage = series_page;
     searchQuery = search_query || '';
+    movieCursor = movie_cursor || null;
+    seriesCursor = series_cursor || null;
+}
+
+// Build the load-more URL for a latest feed, preferring the cursor
+function latestFeedUrl(path, page, cursor) {
+    return cursor ? `${path}/${page}?cursor=${encodeURIComponent(cursor)}` : `${path}/${page}`;
 }
 
 // Load more movies
@@ -17,7 +27,7 @@ function loadMoreMovies() {
     button.disabled = true;
     button.textContent = 'Loading...';
     moviePage++;
-    const url = searchQuery ? `/search_more_movies/${encodeURIComponent(searchQuery)}/${moviePage}` : `/load_more_movies/${moviePage}`;
+    const url = searchQuery ? `/search_more_movies/${encodeURIComponent(searchQuery)}/${moviePage}` : latestFeedUrl('/load_more_movies', moviePage, movieCursor);
     
     fetch(url)
         .then(response => response.json())
@@ -28,6 +38,10 @@ function loadMoreMovies() {
                     const card = createTitleCard(movie, 'movie');
                     slider.appendChild(card);
                 });
+                if ('next_cursor' in data) {
+                    movieCursor = data.next_cursor;
+                    if (!movieCursor) button.style.display = 'none';
+                }
             } else {
                 button.style.display = 'none';
             }
@@ -47,7 +61,7 @@ function loadMoreSeries() {
     button.disabled = true;
     button.textContent = 'Loading...';
     seriesPage++;
-    const url = searchQuery ? `/search_more_series/${encodeURIComponent(searchQuery)}/${seriesPage}` : `/load_more_series/${seriesPage}`;
+    const url = searchQuery ? `/search_more_series/${encodeURIComponent(searchQuery)}/${seriesPage}` : latestFeedUrl('/load_more_series', seriesPage, seriesCursor);
     
     fetch(url)
         .then(response => response.json())
@@ -58,6 +72,10 @@ function loadMoreSeries() {
                     const card = createTitleCard(show, 'series');
                     slider.appendChild(card);
                 });
+                if ('next_cursor' in data) {
+                    seriesCursor = data.next_cursor;
+                    if (!seriesCursor) button.style.display = 'none';
+                }
             } else {
                 button.style.display = 'none';
             }
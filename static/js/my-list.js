@@ -95,7 +95,7 @@ function openMyListModal(items) {
                     ${previewItems.map(item => `
                         <div class="my-list-item" data-type="${item.type}" data-id="${item.id || item.imdb_id}" data-tmdb-id="${item.tmdb_id}">
                             <div class="my-list-item-poster">
-                                ${item.poster_url ? `<img src="${item.poster_url}" alt="${item.title}" loading="lazy">` : `<div class="placeholder-image"><span>${item.title.charAt(0)}</span></div>`}
+                                ${item.poster_url ? `<img src="${item.poster_url}"${item.poster_srcset ? ` srcset="${item.poster_srcset}" sizes="(max-width: 500px) 45vw, 200px"` : ''} alt="${item.title}" loading="lazy">` : `<div class="placeholder-image"><span>${item.title.charAt(0)}</span></div>`}
                                 <div class="my-list-item-overlay">
                                     <button class="btn btn-primary" onclick="homeflixApp.playTitle('${item.type}', '${item.id || item.imdb_id}')">
                                         <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
@@ -1,5 +1,8 @@
 // Title Card Interactions
 
+// Rendered card widths per breakpoint, used to pick a poster from srcset
+const CARD_IMAGE_SIZES = '(max-width: 500px) 45vw, (max-width: 740px) 42vw, (max-width: 950px) 32vw, 20vw';
+
 function setupTitleCardInteractions() {
     // Use event delegation to handle clicks on dynamically added cards
     document.body.addEventListener('click', function(e) {
@@ -117,7 +120,7 @@ function createTitleCard(item, type) {
     
     const quality = type === 'movie' ? item.quality : 'Series';
     const imageHtml = item.poster_url ? 
-        `<img src="${item.poster_url}" alt="${item.title}" loading="lazy">` :
+        `<img src="${item.poster_url}"${item.poster_srcset ? ` srcset="${item.poster_srcset}" sizes="${CARD_IMAGE_SIZES}"` : ''} alt="${item.title}" loading="lazy">` :
         `<div class="placeholder-image"><span>${item.title.charAt(0)}</span></div>`;
     
     card.innerHTML = `
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Never let the tests open the real homeflix.db
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_service  # noqa: E402
+from database import Base  # noqa: E402
+from db_service import DatabaseService  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', poolclass=StaticPool,
+                           connect_args={'check_same_thread': False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def service(engine, monkeypatch):
+    session = sessionmaker(bind=engine)()
+    monkeypatch.setattr(db_service, 'get_db', lambda: session)
+    with DatabaseService() as service:
+        yield service
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed on the engine, recorded as they run"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
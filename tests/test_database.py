@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import inspect, text
+
+import database
+from database import FTS_TABLES, Movie, TVShow, init_db
+
+
+@pytest.fixture
+def initialized(engine, monkeypatch):
+    """Run init_db() against the in-memory test engine"""
+    monkeypatch.setattr(database, 'engine', engine)
+    init_db()
+    return engine
+
+
+def fts_titles(engine, fts_table, query):
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT title FROM {fts_table} WHERE {fts_table} MATCH :query"), {'query': query}
+        ).scalars().all()
+
+
+def test_init_db_creates_fts_tables_and_triggers(initialized):
+    names = set(inspect(initialized).get_table_names())
+    assert {'movies_fts', 'tvshows_fts'} <= names
+
+    with initialized.connect() as conn:
+        triggers = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    for fts_table in FTS_TABLES.values():
+        assert {f"{fts_table}_ai", f"{fts_table}_ad", f"{fts_table}_au"} <= triggers
+
+
+def test_init_db_is_idempotent(initialized):
+    init_db()
+
+
+def test_fts_follows_title_change_from_bulk_upsert(initialized, service):
+    row = {'imdb_id': 'tt0000001', 'tmdb_id': 1, 'title': 'Old Title'}
+    service.create_or_update_movies_batch([row])
+    assert fts_titles(initialized, 'movies_fts', '"old"*') == ['Old Title']
+
+    # Goes through INSERT ... ON CONFLICT DO UPDATE
+    counts = service.create_or_update_movies_batch([dict(row, title='Brand New Name')])
+
+    assert counts['updated'] == 1
+    assert fts_titles(initialized, 'movies_fts', '"old"*') == []
+    assert [movie['title'] for movie in service.search_movies('brand')] == ['Brand New Name']
+
+
+def test_fts_drops_deleted_rows(initialized, service):
+    service.create_or_update_tvshows_batch([{'imdb_id': 'tt0000002', 'tmdb_id': 2, 'title': 'Gone Show'}])
+    service.db.query(TVShow).delete()
+    service.db.commit()
+
+    assert fts_titles(initialized, 'tvshows_fts', '"gone"*') == []
+
+
+def test_init_db_rebuilds_index_of_existing_database(engine, monkeypatch):
+    # A database from before FTS: rows exist but no index or triggers
+    with engine.begin() as conn:
+        conn.execute(Movie.__table__.insert(), [
+            {'imdb_id': f"tt{i:07d}", 'tmdb_id': i, 'title': f"Existing Movie {i}"} for i in range(3)
+        ])
+    monkeypatch.setattr(database, 'engine', engine)
+
+    init_db()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM movies_fts_docsize")).scalar() == 3
+    assert len(fts_titles(engine, 'movies_fts', '"existing"*')) == 3
+
+
+@pytest.mark.parametrize('model', [Movie, TVShow])
+@pytest.mark.parametrize('hero', [False, True])
+@pytest.mark.parametrize('backdrop_path', ['/backdrop.jpg', None])
+def test_card_from_row_matches_to_dict(service, model, hero, backdrop_path):
+    service.db.add(model(imdb_id='tt0000003', tmdb_id=3, title='Card Title', year='2021',
+                         overview='Overview', rating='7.5', genres=['Drama'],
+                         poster_path='/poster.jpg', backdrop_path=backdrop_path))
+    service.db.commit()
+    instance = service.db.query(model).one()
+    row = service.db.query(*model.card_columns(hero=hero)).one()
+
+    card = model.card_from_row(row)
+    full = instance.to_dict()
+
+    assert set(card) <= set(full)
+    assert card == {key: full[key] for key in card}
+    fields = set(model.CARD_FIELDS + (model.HERO_FIELDS if hero else ()))
+    expected = (fields - {'id'}) | {
+        'type', 'id', 'poster_url', 'backdrop_url', 'poster_srcset', 'backdrop_srcset',
+    }
+    assert set(card) == expected
@@ -0,0 +1,154 @@
+import math
+
+import pytest
+
+from database import Movie, MyList, TVShow, WatchedItems, WatchHistory
+from db_service import IN_CHUNK_SIZE
+
+
+def add_movies(service, count):
+    imdb_ids = [f"tt{i:07d}" for i in range(count)]
+    service.db.add_all(Movie(imdb_id=imdb_id, tmdb_id=i + 1, title=f"Movie {i}", poster_path=f"/m{i}.jpg")
+                       for i, imdb_id in enumerate(imdb_ids))
+    service.db.commit()
+    return imdb_ids
+
+
+def add_tvshows(service, count):
+    imdb_ids = [f"tt{i:07d}" for i in range(5_000_000, 5_000_000 + count)]
+    service.db.add_all(TVShow(imdb_id=imdb_id, tmdb_id=i, title=f"Show {i}", poster_path=f"/s{i}.jpg")
+                       for i, imdb_id in enumerate(imdb_ids, start=5_000_000))
+    service.db.commit()
+    return imdb_ids
+
+
+def add_history(service, model, movie_ids, tvshow_ids):
+    """One row of model per title, movies first, with episode info for series"""
+    rows = [model(media_type='movie', media_id=imdb_id, title=imdb_id) for imdb_id in movie_ids]
+    rows += [model(media_type='series', media_id=imdb_id, title=imdb_id,
+                   season_number=1, episode_number=2) for imdb_id in tvshow_ids]
+    for row in rows:
+        if isinstance(row, WatchHistory):
+            row.progress_percent = 50.0
+    service.db.add_all(rows)
+    service.db.commit()
+
+
+MIXED_COUNTS = [(1, 1), (IN_CHUNK_SIZE, 0), (0, IN_CHUNK_SIZE + 1), (1_200, 700)]
+
+
+@pytest.mark.parametrize('count', [1, IN_CHUNK_SIZE, IN_CHUNK_SIZE + 1, 3 * IN_CHUNK_SIZE + 7])
+def test_get_by_imdb_ids_runs_one_query_per_chunk(service, statements, count):
+    imdb_ids = add_movies(service, count)
+    statements.clear()
+
+    found = service._get_by_imdb_ids(Movie, imdb_ids)
+
+    assert set(found) == set(imdb_ids)
+    assert len(statements) == math.ceil(count / IN_CHUNK_SIZE)
+
+
+def test_get_by_imdb_ids_skips_empty_lookup(service, statements):
+    assert service._get_by_imdb_ids(TVShow, []) == {}
+    assert statements == []
+
+
+@pytest.mark.parametrize('count', [1, 50, IN_CHUNK_SIZE + 1, 2 * IN_CHUNK_SIZE + 3])
+def test_get_my_list_hydrates_without_n_plus_one(service, statements, count):
+    imdb_ids = add_movies(service, count)
+    service.db.add_all(MyList(media_type='movie', media_id=imdb_id, tmdb_id=i, title=f"Movie {i}")
+                       for i, imdb_id in enumerate(imdb_ids))
+    service.db.commit()
+    statements.clear()
+
+    items = service.get_my_list()
+
+    assert {item['id'] for item in items} == set(imdb_ids)
+    # One query for the list itself, then one IN lookup per chunk of titles
+    assert len(statements) == 1 + math.ceil(count / IN_CHUNK_SIZE)
+
+
+def movie_row(i, **overrides):
+    row = {
+        'imdb_id': f"tt{i:07d}",
+        'tmdb_id': i,
+        'title': f"Movie {i}",
+        'year': '2020',
+        'genres': ['Drama', 'Thriller'],
+        'poster_path': f"/poster{i}.jpg",
+        'popularity': float(i),
+    }
+    row.update(overrides)
+    return row
+
+
+def test_bulk_upsert_inserts_new_rows(service):
+    counts = service.create_or_update_movies_batch([movie_row(i) for i in range(3)])
+
+    assert counts == {'inserted': 3, 'updated': 0, 'unchanged': 0}
+    assert service.db.query(Movie).count() == 3
+
+
+def test_bulk_upsert_leaves_identical_rows_unchanged(service):
+    rows = [movie_row(i) for i in range(IN_CHUNK_SIZE + 5)]
+    service.create_or_update_movies_batch(rows)
+    version = service.get_catalog_version()
+
+    counts = service.create_or_update_movies_batch(rows)
+
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': len(rows)}
+    assert service.get_catalog_version() == version
+
+
+def test_bulk_upsert_updates_changed_title_and_genres(service):
+    service.create_or_update_movies_batch([movie_row(i) for i in range(3)])
+
+    counts = service.create_or_update_movies_batch([
+        movie_row(0, title='Renamed'),
+        movie_row(1, genres=['Drama', 'Comedy']),
+        movie_row(2),
+    ])
+
+    assert counts == {'inserted': 0, 'updated': 2, 'unchanged': 1}
+    service.db.expire_all()
+    assert service.get_movie_by_imdb_id('tt0000000').title == 'Renamed'
+    assert service.get_movie_by_imdb_id('tt0000001').genres == ['Drama', 'Comedy']
+
+
+def test_bulk_upsert_last_duplicate_in_batch_wins(service):
+    counts = service.create_or_update_movies_batch([
+        movie_row(0, title='First'),
+        movie_row(0, title='Second'),
+        movie_row(1),
+    ])
+
+    assert counts == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    assert service.get_movie_by_imdb_id('tt0000000').title == 'Second'
+
+
+@pytest.mark.parametrize('n_movies, n_tv', MIXED_COUNTS)
+def test_get_continue_watching_hydrates_without_n_plus_one(service, statements, n_movies, n_tv):
+    movie_ids, tvshow_ids = add_movies(service, n_movies), add_tvshows(service, n_tv)
+    add_history(service, WatchHistory, movie_ids, tvshow_ids)
+    statements.clear()
+
+    items = service.get_continue_watching(limit=n_movies + n_tv)
+
+    assert {item['id'] for item in items} == set(movie_ids) | set(tvshow_ids)
+    assert all(item['poster_url'] for item in items)
+    assert len(statements) == (1 + math.ceil(n_movies / IN_CHUNK_SIZE)
+                               + math.ceil(n_tv / IN_CHUNK_SIZE))
+
+
+@pytest.mark.parametrize('n_movies, n_tv', MIXED_COUNTS)
+def test_get_watched_items_hydrates_without_n_plus_one(service, statements, n_movies, n_tv):
+    movie_ids, tvshow_ids = add_movies(service, n_movies), add_tvshows(service, n_tv)
+    add_history(service, WatchedItems, movie_ids, tvshow_ids)
+    statements.clear()
+
+    items = service.get_watched_items(limit=n_movies + n_tv)
+
+    assert {item['id'] for item in items} == set(movie_ids) | set(tvshow_ids)
+    assert all(item['poster_url'] for item in items)
+    assert len(statements) == (1 + math.ceil(n_movies / IN_CHUNK_SIZE)
+                               + math.ceil(n_tv / IN_CHUNK_SIZE))
@@ -0,0 +1,350 @@
+"""
+TMDB API client
+Single entry point for TMDB requests with canonical, hashed cache keys
+"""
+import os
+import hashlib
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+from config import api_config, cache_config
+from db_service import DatabaseService
+from utils import cache_manager, make_api_request, parse_retry_after, tmdb_rate_limiter, SingleFlight, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Sub-resources fetched with title details, shared by detail pages and sync
+# so both read and write the same cached/persisted document
+TITLE_DETAIL_APPEND = {
+    'movie': ('credits', 'external_ids', 'images', 'release_dates'),
+    'tv': ('content_ratings', 'credits', 'external_ids', 'images'),
+}
+# English and language-less images only
+TITLE_IMAGE_LANGUAGE = 'en,null'
+
+# Responses under these paths are persisted in tmdb_documents (not search/trending)
+PERSISTED_PATH_PREFIXES = ('/movie/', '/tv/', '/find/')
+
+# Parts of a response kept when compacting it for storage
+COMPACT_IMAGES = 3
+COMPACT_CAST = 20
+COMPACT_CREW_JOBS = ('Director',)
+
+
+def compact_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop the parts of a TMDB response the app never reads before caching it
+    
+    Keeps the top voted images, the leading cast and directors, and strips
+    per-episode crew/guest stars from season responses.
+    
+    Args:
+        data: TMDB JSON response (modified in place)
+        
+    Returns:
+        The same dictionary
+    """
+    images = data.get('images')
+    if isinstance(images, dict):
+        data['images'] = {
+            kind: sorted(images.get(kind, []), key=lambda x: x.get('vote_average', 0), reverse=True)[:COMPACT_IMAGES]
+            for kind in ('posters', 'backdrops')
+        }
+    for credits in (data, data.get('credits')):
+        if isinstance(credits, dict) and 'cast' in credits and 'crew' in credits:
+            credits['cast'] = credits['cast'][:COMPACT_CAST]
+            credits['crew'] = [person for person in credits['crew'] if person.get('job') in COMPACT_CREW_JOBS]
+    for episode in data.get('episodes', []):
+        episode.pop('crew', None)
+        episode.pop('guest_stars', None)
+    return data
+
+
+class TMDBClient:
+    """
+    TMDB client backed by the 'tmdb' cache namespace
+    
+    Requests take a path relative to the API root (full URLs are accepted
+    too) and a real params dict. Equivalent requests - differing only in
+    param order, value types or None values - share one cache entry, and
+    failed requests are never cached.
+    
+    Entries older than ttl but within stale_grace are still returned, and a
+    background refresh replaces them; if the refresh fails the stale data
+    keeps being served, so titles seen before never wait on TMDB.
+    
+    Title, season and lookup responses are also persisted in the database
+    (tmdb_documents) as a second level behind the cache, so they survive
+    restarts and deploys; sync fills it for every title it processes.
+    """
+    
+    CACHE_NAMESPACE = 'tmdb'
+    
+    def __init__(self, base_url: str = api_config.TMDB_BASE_URL,
+                 access_token: str = api_config.TMDB_ACCESS_TOKEN,
+                 ttl: int = cache_config.TMDB_DATA,
+                 rate_limiter: Optional[TokenBucket] = tmdb_rate_limiter,
+                 stale_grace: int = cache_config.TMDB_STALE_GRACE,
+                 refresh_workers: int = 2,
+                 persist: bool = True):
+        self.base_url = base_url.rstrip('/')
+        self.ttl = ttl
+        self.stale_grace = stale_grace
+        self.refresh_workers = refresh_workers
+        self.persist = persist
+        # Every upstream call waits on this limiter, cached reads do not
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {access_token}'
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=api_config.TMDB_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Coalesce concurrent identical fetches within this process
+        self._flight = SingleFlight()
+        # One background refresh per stale key at a time
+        self._refreshing = SingleFlight()
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+        self._refresh_pool_pid: Optional[int] = None
+        self._stats_lock = threading.Lock()
+        self.refreshes = {'started': 0, 'succeeded': 0, 'failed': 0}
+        self.documents = {'hits': 0, 'stale': 0, 'misses': 0, 'saved': 0, 'fallbacks': 0}
+    
+    def normalize_path(self, path: str) -> str:
+        """Path relative to the API root, with a leading and no trailing slash"""
+        if path.startswith(self.base_url):
+            path = path[len(self.base_url):]
+        return '/' + path.strip('/')
+    
+    @staticmethod
+    def normalize_params(params: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """
+        Canonical string form of query params
+        
+        None values are dropped, booleans become 'true'/'false', sequences are
+        comma-joined and everything else is str()'d; keys are sorted.
+        """
+        normalized = {}
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                value = ','.join(str(item) for item in value)
+            normalized[str(key)] = str(value)
+        return dict(sorted(normalized.items()))
+    
+    def cache_key(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Hashed cache key for a request
+        
+        Args:
+            path: API path or full URL
+            params: Query parameters
+        
+        Returns:
+            Key of the form 'tmdb:<sha256 of path?sorted params>'
+        """
+        canonical = self.normalize_path(path)
+        query = urlencode(self.normalize_params(params))
+        if query:
+            canonical = f"{canonical}?{query}"
+        return f"tmdb:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+    
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Get JSON from cache or fetch it from TMDB
+        
+        Args:
+            path: API path (e.g. '/movie/550') or full URL
+            params: Query parameters
+        
+        Returns:
+            JSON response as dictionary, or {} if the request failed
+        """
+        path = self.normalize_path(path)
+        params = self.normalize_params(params)
+        cache_key = self.cache_key(path, params)
+        
+        entry = cache_manager.get_entry(self.CACHE_NAMESPACE, cache_key, self.ttl, self.stale_grace)
+        if entry is not None:
+            cached_data, stale = entry
+            if stale:
+                self._refresh_in_background(cache_key, path, params)
+            return cached_data
+        
+        stored = self._load_document(cache_key, path)
+        if stored is not None:
+            payload, age = stored
+            if age < self.ttl:
+                self._count('documents', 'hits')
+                # Warm the cache; the entry may then outlive TMDB_DATA by up to its age
+                cache_manager.set(self.CACHE_NAMESPACE, cache_key, payload)
+                return payload
+            if age < self.ttl + self.stale_grace:
+                self._count('documents', 'stale')
+                self._refresh_in_background(cache_key, path, params)
+                return payload
+        
+        try:
+            return self._flight.do(cache_key, self._fetch, cache_key, path, params)
+        except Exception as e:
+            if stored is not None:
+                # Older than the grace window, but better than nothing while TMDB fails
+                logger.warning(f"Error fetching TMDB data from {path}, serving stored copy: {e}")
+                self._count('documents', 'fallbacks')
+                return stored[0]
+            logger.error(f"Error fetching TMDB data from {path}: {e}")
+            return {}
+    
+    def _fetch(self, cache_key: str, path: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch from TMDB and store the compacted response under cache_key"""
+        data = make_api_request(f"{self.base_url}{path}", params=params or None,
+                                session=self.session, rate_limiter=self.rate_limiter)
+        data = compact_payload(data)
+        cache_manager.set(self.CACHE_NAMESPACE, cache_key, data)
+        self._save_document(cache_key, path, data)
+        return data
+    
+    def _persisted(self, path: str) -> bool:
+        return self.persist and path.startswith(PERSISTED_PATH_PREFIXES)
+    
+    def _load_document(self, cache_key: str, path: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Get (payload, age in seconds) of a persisted response, if any"""
+        if not self._persisted(path):
+            return None
+        try:
+            with DatabaseService() as db_service:
+                stored = db_service.get_tmdb_document(cache_key)
+        except Exception as e:
+            logger.warning(f"Could not read stored TMDB document {path}: {e}")
+            return None
+        if stored is None:
+            self._count('documents', 'misses')
+            return None
+        payload, fetched_at = stored
+        return payload, (datetime.utcnow() - fetched_at).total_seconds()
+    
+    def _save_document(self, cache_key: str, path: str, data: Dict[str, Any]):
+        """Persist a response; failures only cost a refetch after restart"""
+        if not data or not self._persisted(path):
+            return
+        try:
+            with DatabaseService() as db_service:
+                db_service.save_tmdb_document(cache_key, path, data)
+            self._count('documents', 'saved')
+        except Exception as e:
+            logger.warning(f"Could not store TMDB document {path}: {e}")
+    
+    def _executor(self) -> ThreadPoolExecutor:
+        """Refresh pool for this process (recreated in forked workers)"""
+        if self._refresh_pool is None or self._refresh_pool_pid != os.getpid():
+            self._refresh_pool = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                                    thread_name_prefix='tmdb-refresh')
+            self._refresh_pool_pid = os.getpid()
+        return self._refresh_pool
+    
+    def _refresh_in_background(self, cache_key: str, path: str, params: Dict[str, str]):
+        """Start refreshing a stale entry unless a refresh for it is already running"""
+        call, is_leader = self._refreshing.begin(cache_key)
+        if not is_leader:
+            return
+        
+        def refresh():
+            try:
+                result = self._flight.do(cache_key, self._fetch, cache_key, path, params)
+                self._count('refreshes', 'succeeded')
+                self._refreshing.finish(cache_key, call, result=result)
+            except BaseException as e:
+                # Keep serving the stale entry; the next read past ttl retries
+                logger.warning(f"Background refresh of TMDB {path} failed, serving stale data: {e}")
+                self._count('refreshes', 'failed')
+                self._refreshing.finish(cache_key, call, error=e)
+        
+        self._count('refreshes', 'started')
+        try:
+            self._executor().submit(refresh)
+        except RuntimeError as e:
+            # Interpreter shutting down
+            self._refreshing.finish(cache_key, call, error=e)
+    
+    def _count(self, group: str, outcome: str):
+        with self._stats_lock:
+            getattr(self, group)[outcome] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Stale-while-revalidate settings, refresh and stored-document counts for /metrics"""
+        with self._stats_lock:
+            return {
+                'ttl_seconds': self.ttl,
+                'stale_grace_seconds': self.stale_grace,
+                'refreshes': dict(self.refreshes),
+                'documents': dict(self.documents),
+            }
+    
+    def request(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        Send one rate-limited, uncached request and return the raw response
+        
+        For callers that need the status code or fresh data; a 429 still
+        pauses the shared limiter.
+        
+        Raises:
+            RateLimitExceeded: If no slot is available within the limiter's max wait
+            requests.RequestException: On connection errors
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = self.session.get(f"{self.base_url}{self.normalize_path(path)}",
+                                    params=self.normalize_params(params) or None,
+                                    timeout=api_config.REQUEST_TIMEOUT)
+        if response.status_code == 429 and self.rate_limiter is not None:
+            self.rate_limiter.penalize(parse_retry_after(response.headers.get('Retry-After')) or 1.0)
+        return response
+    
+    def get_details(self, media_type: str, tmdb_id: int, append: tuple = (),
+                    params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Get movie/TV details and sub-resources in one request via append_to_response
+        
+        Args:
+            media_type: 'movie' or 'tv'
+            tmdb_id: TMDB ID
+            append: Sub-resources to include, e.g. ('credits', 'release_dates');
+                each one is returned under its own key in the response
+            params: Extra query parameters
+            
+        Returns:
+            Details dictionary, or {} if the request failed
+        """
+        params = dict(params or {})
+        if append:
+            # Sorted so the same set of sub-resources always shares a cache entry
+            params['append_to_response'] = sorted(set(append))
+        return self.get(f"/{media_type}/{tmdb_id}", params)
+    
+    def get_title_details(self, media_type: str, tmdb_id: int) -> Dict[str, Any]:
+        """
+        Get the shared title document: details with TITLE_DETAIL_APPEND sub-resources
+        
+        Args:
+            media_type: 'movie' or 'tv'
+            tmdb_id: TMDB ID
+            
+        Returns:
+            Details dictionary, or {} if the request failed
+        """
+        return self.get_details(media_type, tmdb_id, TITLE_DETAIL_APPEND[media_type],
+                                {'include_image_language': TITLE_IMAGE_LANGUAGE})
+    
+    def find_by_imdb_id(self, imdb_id: str) -> Dict[str, Any]:
+        """Look up TMDB movie/TV results for an IMDB ID"""
+        return self.get(f"/find/{imdb_id}", {'external_source': 'imdb_id'})
+
+
+# Global TMDB client instance
+tmdb_client = TMDBClient(refresh_workers=api_config.TMDB_REFRESH_WORKERS)
@@ -2,72 +2,934 @@
 Utility functions for common operations
 Centralized helper functions for better code reuse
 """
+import os
+import sys
+import json
 import time
+import pickle
+import hashlib
+import sqlite3
 import logging
+import threading
 import requests
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
 from functools import wraps
 from typing import Any, Callable, Optional, Dict, Tuple
-from config import api_config
+from config import api_config, cache_config
 
 logger = logging.getLogger(__name__)
 
 
-class CacheManager:
-    """Smart cache manager with automatic expiration"""
+def approx_size(value: Any) -> int:
+    """Approximate in-memory size of a cached value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+
+class CacheCounters:
+    """Thread-safe per-namespace event counters and read latency"""
+    
+    EVENTS = ('hits', 'misses', 'stale', 'expired', 'evicted', 'sets')
     
     def __init__(self):
-        self._caches: Dict[str, Dict[str, Tuple[Any, float]]] = {}
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, float]] = {}
+    
+    def _namespace(self, cache_name: str) -> Dict[str, float]:
+        counts = self._counts.get(cache_name)
+        if counts is None:
+            counts = self._counts[cache_name] = dict.fromkeys(self.EVENTS + ('get_seconds',), 0)
+        return counts
+    
+    def record(self, cache_name: str, event: str, count: int = 1):
+        """Add count occurrences of an event to a namespace"""
+        if count:
+            with self._lock:
+                self._namespace(cache_name)[event] += count
+    
+    def record_get(self, cache_name: str, hit: bool, seconds: float):
+        """Record the outcome and duration of one cache read"""
+        with self._lock:
+            counts = self._namespace(cache_name)
+            counts['hits' if hit else 'misses'] += 1
+            counts['get_seconds'] += seconds
+    
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self._counts = {}
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters per namespace with hit rate and average read latency"""
+        with self._lock:
+            result = {}
+            for name, counts in self._counts.items():
+                reads = counts['hits'] + counts['misses']
+                stats = {event: int(counts[event]) for event in self.EVENTS}
+                stats['hit_rate'] = round(counts['hits'] / reads, 4) if reads else None
+                stats['avg_get_ms'] = round(counts['get_seconds'] * 1000 / reads, 3) if reads else None
+                result[name] = stats
+            return result
+
+
+class MemoryCacheBackend:
+    """
+    Thread-safe in-process LRU cache with per-namespace bounds
+    
+    Each namespace is capped by entry count and approximate byte size;
+    the least recently used entries are evicted first.
+    """
+    
+    def __init__(self, max_entries: int, max_bytes: int,
+                 limits: Optional[Dict[str, Tuple[int, int]]] = None,
+                 memory_budget: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.limits = limits or {}
+        # Cap on the approximate bytes of all namespaces together
+        self.memory_budget = memory_budget
+        self._lock = threading.RLock()
+        # namespace -> key -> (value, timestamp, size)
+        self._caches: Dict[str, OrderedDict] = {}
+        self._bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self.budget_evictions = 0
+        self.counters = CacheCounters()
+    
+    def _limits_for(self, cache_name: str) -> Tuple[int, int]:
+        return self.limits.get(cache_name, (self.max_entries, self.max_bytes))
+    
+    def _remove(self, cache_name: str, key: str):
+        _, _, size = self._caches[cache_name].pop(key)
+        self._bytes[cache_name] -= size
+        self._total_bytes -= size
+    
+    def get(self, cache_name: str, key: str, duration: int) -> Optional[Any]:
+        """Get value from cache if not expired, marking it recently used"""
+        entry = self.get_entry(cache_name, key, duration)
+        return entry[0] if entry else None
+    
+    def get_entry(self, cache_name: str, key: str, duration: int) -> Optional[Tuple[Any, float]]:
+        """Get (value, age in seconds) if younger than duration, marking it recently used"""
+        with self._lock:
+            cache = self._caches.get(cache_name)
+            if not cache or key not in cache:
+                return None
+            value, timestamp, _ = cache[key]
+            age = time.time() - timestamp
+            if age >= duration:
+                # Remove expired entry
+                self._remove(cache_name, key)
+                self.counters.record(cache_name, 'expired')
+                return None
+            cache.move_to_end(key)
+            return value, age
+    
+    def set(self, cache_name: str, key: str, value: Any):
+        """Set value with current timestamp, evicting LRU entries over the bounds"""
+        size = approx_size(value)
+        max_entries, max_bytes = self._limits_for(cache_name)
+        with self._lock:
+            cache = self._caches.setdefault(cache_name, OrderedDict())
+            self._bytes.setdefault(cache_name, 0)
+            if key in cache:
+                self._remove(cache_name, key)
+            cache[key] = (value, time.time(), size)
+            self._bytes[cache_name] += size
+            self._total_bytes += size
+            while cache and (len(cache) > max_entries or self._bytes[cache_name] > max_bytes):
+                self._remove(cache_name, next(iter(cache)))
+                self.counters.record(cache_name, 'evicted')
+            if self.memory_budget and self._total_bytes > self.memory_budget:
+                self.enforce_budget()
+    
+    def enforce_budget(self) -> int:
+        """
+        Evict LRU entries from the largest namespaces until within memory_budget
+        
+        Returns:
+            Number of entries evicted
+        """
+        evicted = 0
+        with self._lock:
+            while self.memory_budget and self._total_bytes > self.memory_budget:
+                cache_name = max(self._bytes, key=self._bytes.get)
+                cache = self._caches[cache_name]
+                if not cache:
+                    break
+                self._remove(cache_name, next(iter(cache)))
+                self.counters.record(cache_name, 'evicted')
+                evicted += 1
+            self.budget_evictions += evicted
+        return evicted
+    
+    def clear(self, cache_name: Optional[str] = None):
+        """Clear specific cache or all caches"""
+        with self._lock:
+            if cache_name:
+                self._caches.pop(cache_name, None)
+                self._total_bytes -= self._bytes.pop(cache_name, 0)
+            else:
+                self._caches = {}
+                self._bytes = {}
+                self._total_bytes = 0
+    
+    def size(self, cache_name: Optional[str] = None) -> int:
+        """Get size of specific cache or total size"""
+        with self._lock:
+            if cache_name:
+                return len(self._caches.get(cache_name, ()))
+            return sum(len(cache) for cache in self._caches.values())
+    
+    def cleanup_expired(self, cache_name: str, duration: int) -> int:
+        """Remove expired entries from cache and return how many were removed"""
+        now = time.time()
+        with self._lock:
+            cache = self._caches.get(cache_name, {})
+            expired_keys = [
+                key for key, (_, timestamp, _) in cache.items()
+                if now - timestamp >= duration
+            ]
+            for key in expired_keys:
+                self._remove(cache_name, key)
+            self.counters.record(cache_name, 'expired', len(expired_keys))
+            return len(expired_keys)
     
-    def get_cache(self, cache_name: str) -> dict:
-        """Get or create a named cache"""
-        if cache_name not in self._caches:
-            self._caches[cache_name] = {}
-        return self._caches[cache_name]
+    def namespaces(self) -> list:
+        """Names of the namespaces currently holding entries"""
+        with self._lock:
+            return list(self._caches)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Entries and approximate bytes per namespace"""
+        with self._lock:
+            return {
+                name: {'entries': len(cache), 'bytes': self._bytes.get(name, 0)}
+                for name, cache in self._caches.items()
+            }
+    
+    def total_bytes(self) -> int:
+        """Approximate bytes held across all namespaces"""
+        return self._total_bytes
+
+
+class SQLiteCacheBackend:
+    """
+    Cache shared by every process on the host through a SQLite file
+    
+    Values are pickled. Each thread (and each forked worker) opens its own
+    connection; failures are logged and treated as cache misses so caching
+    can never break a request.
+    """
+    
+    TRIM_EVERY = 256  # Enforce max_entries once per this many sets per namespace
+    
+    def __init__(self, path: str, max_entries: int,
+                 limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.path = os.path.abspath(path)
+        self.max_entries = max_entries
+        self.limits = limits or {}
+        self._local = threading.local()
+        self._sets_lock = threading.Lock()
+        self._sets_since_trim: Dict[str, int] = {}
+        self.counters = CacheCounters()
+        self._connection()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_age ON cache_entries (namespace, stored_at)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
     
     def get(self, cache_name: str, key: str, duration: int) -> Optional[Any]:
         """Get value from cache if not expired"""
-        cache = self.get_cache(cache_name)
-        if key in cache:
-            value, timestamp = cache[key]
-            if time.time() - timestamp < duration:
-                return value
+        entry = self.get_entry(cache_name, key, duration)
+        return entry[0] if entry else None
+    
+    def get_entry(self, cache_name: str, key: str, duration: int) -> Optional[Tuple[Any, float]]:
+        """Get (value, age in seconds) if younger than duration"""
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, stored_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (cache_name, key)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            age = time.time() - stored_at
+            if age >= duration:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ? AND stored_at = ?",
+                    (cache_name, key, stored_at)
+                )
+                self.counters.record(cache_name, 'expired')
+                return None
+            return pickle.loads(value), age
+        except Exception as e:
+            logger.warning(f"Shared cache read failed for {cache_name}: {e}")
+            return None
+    
+    def set(self, cache_name: str, key: str, value: Any):
+        """Set value in cache with current timestamp"""
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (cache_name, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time())
+            )
+        except Exception as e:
+            logger.warning(f"Shared cache write failed for {cache_name}: {e}")
+            return
+        
+        with self._sets_lock:
+            count = self._sets_since_trim.get(cache_name, 0) + 1
+            self._sets_since_trim[cache_name] = count % self.TRIM_EVERY
+        if count >= self.TRIM_EVERY:
+            self._trim(cache_name)
+    
+    def _trim(self, cache_name: str):
+        """Drop the oldest entries of a namespace beyond its entry limit"""
+        max_entries = self.limits.get(cache_name, (self.max_entries, None))[0]
+        try:
+            cursor = self._connection().execute(
+                """DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (cache_name, cache_name, max_entries)
+            )
+            self.counters.record(cache_name, 'evicted', max(cursor.rowcount, 0))
+        except Exception as e:
+            logger.warning(f"Shared cache trim failed for {cache_name}: {e}")
+    
+    def clear(self, cache_name: Optional[str] = None):
+        """Clear specific cache or all caches"""
+        try:
+            if cache_name:
+                self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (cache_name,))
             else:
-                # Remove expired entry
-                del cache[key]
-        return None
+                self._connection().execute("DELETE FROM cache_entries")
+        except Exception as e:
+            logger.warning(f"Shared cache clear failed: {e}")
+    
+    def size(self, cache_name: Optional[str] = None) -> int:
+        """Get size of specific cache or total size"""
+        try:
+            if cache_name:
+                row = self._connection().execute(
+                    "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (cache_name,)
+                ).fetchone()
+            else:
+                row = self._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+            return row[0]
+        except Exception as e:
+            logger.warning(f"Shared cache size failed: {e}")
+            return 0
+    
+    def cleanup_expired(self, cache_name: str, duration: int) -> int:
+        """Remove expired entries from cache and return how many were removed"""
+        try:
+            cursor = self._connection().execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND stored_at <= ?",
+                (cache_name, time.time() - duration)
+            )
+            removed = max(cursor.rowcount, 0)
+            self.counters.record(cache_name, 'expired', removed)
+            return removed
+        except Exception as e:
+            logger.warning(f"Shared cache cleanup failed for {cache_name}: {e}")
+            return 0
+    
+    def namespaces(self) -> list:
+        """Names of the namespaces currently holding entries"""
+        try:
+            return [row[0] for row in self._connection().execute(
+                "SELECT DISTINCT namespace FROM cache_entries"
+            )]
+        except Exception as e:
+            logger.warning(f"Shared cache namespace listing failed: {e}")
+            return []
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Entries and stored (pickled) bytes per namespace"""
+        try:
+            return {
+                name: {'entries': entries, 'bytes': size or 0}
+                for name, entries, size in self._connection().execute(
+                    "SELECT namespace, COUNT(*), SUM(LENGTH(value)) FROM cache_entries GROUP BY namespace"
+                )
+            }
+        except Exception as e:
+            logger.warning(f"Shared cache stats failed: {e}")
+            return {}
+
+
+class CacheManager:
+    """
+    Smart cache manager with automatic expiration
+    
+    Namespaces listed in shared_namespaces live in the shared backend (when
+    one is configured) so every worker sees them; the rest use the local one.
+    """
+    
+    def __init__(self, local_backend: Optional[MemoryCacheBackend] = None,
+                 shared_backend: Optional[SQLiteCacheBackend] = None,
+                 shared_namespaces: Tuple[str, ...] = ()):
+        self.local = local_backend or MemoryCacheBackend(cache_config.MAX_ENTRIES, cache_config.MAX_BYTES)
+        self.shared = shared_backend
+        self.shared_namespaces = frozenset(shared_namespaces)
+        # One set of counters for the manager and both backends (per process)
+        self.counters = CacheCounters()
+        for backend in (self.local, self.shared):
+            if backend is not None:
+                backend.counters = self.counters
+    
+    def backend_for(self, cache_name: str):
+        """Backend holding a namespace"""
+        if self.shared is not None and cache_name in self.shared_namespaces:
+            return self.shared
+        return self.local
+    
+    def get(self, cache_name: str, key: str, duration: int) -> Optional[Any]:
+        """Get value from cache if not expired"""
+        start = time.perf_counter()
+        value = self.backend_for(cache_name).get(cache_name, key, duration)
+        self.counters.record_get(cache_name, value is not None, time.perf_counter() - start)
+        return value
+    
+    def get_entry(self, cache_name: str, key: str, duration: int,
+                  grace: int = 0) -> Optional[Tuple[Any, bool]]:
+        """
+        Get a value that may be past its duration but still within a grace window
+        
+        Args:
+            cache_name: Namespace
+            key: Cache key
+            duration: Seconds an entry is fresh
+            grace: Extra seconds a stale entry is still returned
+            
+        Returns:
+            Tuple of (value, is_stale), or None on a miss
+        """
+        start = time.perf_counter()
+        entry = self.backend_for(cache_name).get_entry(cache_name, key, duration + grace)
+        self.counters.record_get(cache_name, entry is not None, time.perf_counter() - start)
+        if entry is None:
+            return None
+        value, age = entry
+        stale = age >= duration
+        if stale:
+            self.counters.record(cache_name, 'stale')
+        return value, stale
     
     def set(self, cache_name: str, key: str, value: Any):
         """Set value in cache with current timestamp"""
-        cache = self.get_cache(cache_name)
-        cache[key] = (value, time.time())
+        self.backend_for(cache_name).set(cache_name, key, value)
+        self.counters.record(cache_name, 'sets')
     
     def clear(self, cache_name: Optional[str] = None):
         """Clear specific cache or all caches"""
         if cache_name:
-            self._caches[cache_name] = {}
-        else:
-            self._caches = {}
+            self.backend_for(cache_name).clear(cache_name)
+            return
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
     
     def size(self, cache_name: Optional[str] = None) -> int:
         """Get size of specific cache or total size"""
         if cache_name:
-            return len(self._caches.get(cache_name, {}))
-        return sum(len(cache) for cache in self._caches.values())
+            return self.backend_for(cache_name).size(cache_name)
+        total = self.local.size()
+        if self.shared is not None:
+            total += self.shared.size()
+        return total
     
-    def cleanup_expired(self, cache_name: str, duration: int):
-        """Remove expired entries from cache"""
-        cache = self.get_cache(cache_name)
-        now = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in cache.items()
-            if now - timestamp >= duration
-        ]
-        for key in expired_keys:
-            del cache[key]
+    def cleanup_expired(self, cache_name: str, duration: int) -> int:
+        """Remove expired entries from cache and return how many were removed"""
+        return self.backend_for(cache_name).cleanup_expired(cache_name, duration)
+    
+    def namespaces(self) -> list:
+        """Names of every namespace holding entries, local and shared"""
+        names = set(self.local.namespaces())
+        if self.shared is not None:
+            names.update(self.shared.namespaces())
+        return sorted(names)
+    
+    def sweep(self, ttls: Dict[str, int], default_ttl: int) -> int:
+        """
+        Drop expired entries from every namespace and enforce the memory budget
+        
+        Args:
+            ttls: TTL in seconds per namespace
+            default_ttl: TTL for namespaces missing from ttls
+            
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for cache_name in self.namespaces():
+            removed += self.cleanup_expired(cache_name, ttls.get(cache_name, default_ttl))
+        removed += self.local.enforce_budget()
+        return removed
+    
+    def memory_stats(self) -> Dict[str, Any]:
+        """Per-namespace entries/bytes for each backend plus the memory budget"""
+        stats = {
+            'local': self.local.stats(),
+            'local_bytes': self.local.total_bytes(),
+            'local_budget_bytes': self.local.memory_budget,
+            'budget_evictions': self.local.budget_evictions,
+        }
+        if self.shared is not None:
+            stats['shared'] = self.shared.stats()
+        return stats
+    
+    def counter_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit, miss, expiry, eviction and set counters per namespace for this process"""
+        return self.counters.snapshot()
+
+
+class CacheSweeper:
+    """
+    Daemon thread that periodically expires entries in every namespace
+    
+    start() is idempotent within a process and restarts the thread in a
+    forked worker, where the parent's threads do not exist.
+    """
+    
+    def __init__(self, manager: CacheManager, interval: int):
+        self.manager = manager
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+        self.runs = 0
+        self.removed = 0
+        self.last_run: Optional[float] = None
+    
+    def start(self):
+        """Start sweeping in the background for the current process"""
+        if self.interval <= 0:
+            return
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        self._stop = threading.Event()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='cache-sweeper', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Ask the sweeper thread to exit"""
+        self._stop.set()
+    
+    def run_once(self) -> int:
+        """Sweep every namespace now and return the number of entries removed"""
+        removed = self.manager.sweep(cache_config.namespace_ttls(), cache_config.TMDB_DATA)
+        self.runs += 1
+        self.removed += removed
+        self.last_run = time.time()
+        return removed
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"Cache sweep failed: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Sweeper activity for /metrics"""
+        return {
+            'interval_seconds': self.interval,
+            'running': self._thread is not None and self._thread.is_alive() and self._pid == os.getpid(),
+            'runs': self.runs,
+            'entries_removed': self.removed,
+            'last_run': self.last_run,
+        }
+
+
+def create_cache_manager() -> CacheManager:
+    """Build the cache manager described by CacheConfig"""
+    local = MemoryCacheBackend(cache_config.MAX_ENTRIES, cache_config.MAX_BYTES,
+                               cache_config.NAMESPACE_LIMITS, cache_config.MEMORY_BUDGET)
+    shared = None
+    if cache_config.BACKEND == 'sqlite':
+        try:
+            shared = SQLiteCacheBackend(cache_config.SHARED_PATH, cache_config.MAX_ENTRIES,
+                                        cache_config.NAMESPACE_LIMITS)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable, using per-process cache only: {e}")
+    elif cache_config.BACKEND != 'memory':
+        logger.warning(f"Unknown CACHE_BACKEND {cache_config.BACKEND!r}, using 'memory'")
+    return CacheManager(local, shared, cache_config.SHARED_NAMESPACES)
 
 
 # Global cache manager instance
-cache_manager = CacheManager()
+cache_manager = create_cache_manager()
+cache_sweeper = CacheSweeper(cache_manager, cache_config.SWEEP_INTERVAL)
+
+
+class _FlightCall:
+    """A single in-flight call whose outcome is shared with every waiter"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+    
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the call to finish and return its result
+        
+        Raises:
+            TimeoutError: If the call does not finish within timeout
+            Exception: Whatever the leading call raised
+        """
+        if not self.event.wait(timeout):
+            raise TimeoutError("Timed out waiting for in-flight call")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key within a process
+    
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for it and share its result (or its exception).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _FlightCall] = {}
+    
+    def begin(self, key: str) -> Tuple[_FlightCall, bool]:
+        """
+        Join the in-flight call for key or start a new one
+        
+        Returns:
+            Tuple of (call, is_leader); the leader must call finish()
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _FlightCall()
+            self._calls[key] = call
+            return call, True
+    
+    def finish(self, key: str, call: _FlightCall, result: Any = None,
+               error: Optional[BaseException] = None):
+        """Publish the outcome of a call and wake its waiters (idempotent)"""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if call.event.is_set():
+                return
+            call.result = result
+            call.error = error
+            call.event.set()
+    
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """Run func once for all concurrent callers with the same key"""
+        call, is_leader = self.begin(key)
+        if not is_leader:
+            return call.wait()
+        
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a rate limiter slot is further away than the caller will wait"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header
+    
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, or None if missing or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Retry-After seconds carried by a requests HTTPError, if any"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    return parse_retry_after(response.headers.get('Retry-After'))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting requests per second within a process
+    
+    acquire() reserves the next slot and sleeps until it is due, so waiting
+    callers are served in order at the configured rate. penalize() stops
+    refilling for a while, e.g. after an upstream Retry-After.
+    """
+    
+    backend = 'memory'
+    
+    def __init__(self, rate: float, burst: int, max_wait: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.time()
+        # Per-process metrics
+        self._stats_lock = threading.Lock()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+    
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        """Tokens available at now; updated may be in the future while penalized"""
+        return min(self.burst, tokens + (now - updated) * self.rate)
+    
+    def _take(self, tokens: float, updated: float, now: float,
+              max_wait: Optional[float]) -> Tuple[float, float, float]:
+        """New (tokens, updated) state after taking one token, plus the wait for it"""
+        tokens = self._refill(tokens, updated, now) - 1
+        # A negative balance is a queue of reservations spaced 1/rate apart
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitExceeded(f"Next slot in {wait:.1f}s exceeds {max_wait:.1f}s")
+        return tokens, now, wait
+    
+    def _pause(self, tokens: float, updated: float, now: float,
+               seconds: float) -> Tuple[float, float, None]:
+        """New (tokens, updated) state that refills nothing until now + seconds"""
+        return min(self._refill(tokens, updated, now), 0.0), max(updated, now + seconds), None
+    
+    def _reserve(self, max_wait: Optional[float]) -> float:
+        """Take one token and return the seconds until it may be used"""
+        with self._lock:
+            self._tokens, self._updated, wait = self._take(self._tokens, self._updated, time.time(), max_wait)
+            return wait
+    
+    def _penalize(self, seconds: float):
+        with self._lock:
+            self._tokens, self._updated, _ = self._pause(self._tokens, self._updated, time.time(), seconds)
+    
+    def _backlog(self) -> float:
+        """Reserved requests not yet due across every process using the bucket"""
+        with self._lock:
+            return max(-self._refill(self._tokens, self._updated, time.time()), 0.0)
+    
+    def acquire(self, max_wait: Optional[float] = None):
+        """
+        Block until a request may be sent
+        
+        Args:
+            max_wait: Longest acceptable wait in seconds (defaults to self.max_wait)
+            
+        Raises:
+            RateLimitExceeded: If the next slot is further away than max_wait
+        """
+        try:
+            wait = self._reserve(self.max_wait if max_wait is None else max_wait)
+        except RateLimitExceeded:
+            with self._stats_lock:
+                self.rejected += 1
+            raise
+        if wait > 0:
+            with self._stats_lock:
+                self.waiting += 1
+                self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                time.sleep(wait)
+            finally:
+                with self._stats_lock:
+                    self.waiting -= 1
+        with self._stats_lock:
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait_seen = max(self.max_wait_seen, wait)
+    
+    def penalize(self, seconds: float):
+        """Pause the bucket for seconds after the upstream asked us to back off"""
+        with self._stats_lock:
+            self.throttled += 1
+        logger.warning(f"Upstream rate limited, pausing requests for {seconds:.1f}s")
+        self._penalize(seconds)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Limiter settings, queue depth and wait times for /metrics"""
+        with self._stats_lock:
+            return {
+                'backend': self.backend,
+                'rate_per_second': self.rate,
+                'burst': self.burst,
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'backlog': round(self._backlog(), 2),
+                'acquired': self.acquired,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'avg_wait_ms': round(self.total_wait * 1000 / self.acquired, 3) if self.acquired else None,
+                'max_wait_ms': round(self.max_wait_seen * 1000, 3),
+            }
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a SQLite file shared by every process
+    
+    Each reservation is one short IMMEDIATE transaction, so the web workers
+    and the sync job draw from the same budget. If the file cannot be used
+    the bucket falls back to limiting within this process.
+    """
+    
+    backend = 'sqlite'
+    
+    def __init__(self, path: str, rate: float, burst: int, max_wait: Optional[float] = None,
+                 name: str = 'tmdb'):
+        super().__init__(rate, burst, max_wait)
+        self.path = os.path.abspath(path)
+        self.name = name
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS rate_limits (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def _update(self, func: Callable[[float, float, float], Tuple[float, float, Any]]) -> Any:
+        """Read, transform and write the bucket row in one transaction"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limits WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            tokens, updated = row if row else (float(self.burst), now)
+            tokens, updated, result = func(tokens, updated, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, tokens, updated)
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _reserve(self, max_wait: Optional[float]) -> float:
+        try:
+            return self._update(lambda tokens, updated, now: self._take(tokens, updated, now, max_wait))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared rate limiter unavailable, limiting locally: {e}")
+            return super()._reserve(max_wait)
+    
+    def _penalize(self, seconds: float):
+        try:
+            self._update(lambda tokens, updated, now: self._pause(tokens, updated, now, seconds))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared rate limiter unavailable, pausing locally: {e}")
+            super()._penalize(seconds)
+    
+    def _backlog(self) -> float:
+        try:
+            row = self._connection().execute(
+                "SELECT tokens, updated_at FROM rate_limits WHERE name = ?", (self.name,)
+            ).fetchone()
+        except sqlite3.Error:
+            return super()._backlog()
+        if row is None:
+            return 0.0
+        return max(-self._refill(row[0], row[1], time.time()), 0.0)
+
+
+def create_tmdb_rate_limiter() -> TokenBucket:
+    """Build the TMDB rate limiter from api_config (shared when a path is set)"""
+    if api_config.TMDB_RATE_LIMIT_PATH:
+        try:
+            limiter = SQLiteTokenBucket(api_config.TMDB_RATE_LIMIT_PATH, api_config.TMDB_RATE_LIMIT,
+                                        api_config.TMDB_RATE_BURST, api_config.TMDB_RATE_MAX_WAIT)
+            limiter._connection()
+            return limiter
+        except Exception as e:
+            logger.warning(f"Falling back to per-process TMDB rate limiter: {e}")
+    return TokenBucket(api_config.TMDB_RATE_LIMIT, api_config.TMDB_RATE_BURST, api_config.TMDB_RATE_MAX_WAIT)
+
+
+# Global TMDB rate limiter, shared by the web server and the sync job
+tmdb_rate_limiter = create_tmdb_rate_limiter()
+
+
+def make_cache_key(prefix: str, *args, **kwargs) -> str:
+    """
+    Stable hashed cache key for a call
+    
+    Keyword argument order does not matter, and values are serialized as
+    JSON (falling back to str() for other types) rather than their repr.
+    
+    Args:
+        prefix: Key prefix, e.g. the function name
+        
+    Returns:
+        Key of the form '<prefix>:<sha256>'
+    """
+    payload = json.dumps([args, kwargs], sort_keys=True, default=str, separators=(',', ':'))
+    return f"{prefix}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
 
 
 def timed_cache(cache_name: str, duration: int):
@@ -82,7 +944,7 @@ def timed_cache(cache_name: str, duration: int):
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Create cache key from function name and arguments
-            cache_key = f"{func.__name__}_{str(args)}_{str(kwargs)}"
+            cache_key = make_cache_key(f"{func.__module__}.{func.__qualname__}", *args, **kwargs)
             
             # Try to get from cache
             cached_value = cache_manager.get(cache_name, cache_key, duration)
@@ -98,14 +960,29 @@ def timed_cache(cache_name: str, duration: int):
     return decorator
 
 
-def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed request may succeed if repeated (not a 4xx other than 408/429)"""
+    if isinstance(error, RateLimitExceeded):
+        return False
+    response = getattr(error, 'response', None)
+    if response is not None and 400 <= response.status_code < 500:
+        return response.status_code in (408, 429)
+    return True
+
+
+def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0,
+                     max_retry_after: Optional[float] = None):
     """
     Decorator to retry function on failure with exponential backoff
     
+    Client errors other than 408/429 are not retried. When the failure carries
+    a Retry-After header, that delay is used instead of the backoff.
+    
     Args:
         max_retries: Maximum number of retry attempts
         delay: Initial delay between retries in seconds
         backoff: Multiplier for delay after each retry
+        max_retry_after: Give up instead of waiting longer than this for Retry-After
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -118,12 +995,19 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
                     return func(*args, **kwargs)
                 except Exception as e:
                     last_exception = e
+                    if not is_retryable(e):
+                        break
+                    retry_after = get_retry_after(e)
+                    if max_retry_after is not None and retry_after is not None and retry_after > max_retry_after:
+                        logger.error(f"Not retrying {func.__name__}: Retry-After {retry_after:.1f}s is too long")
+                        break
                     if attempt < max_retries:
+                        wait = current_delay if retry_after is None else retry_after
                         logger.warning(
                             f"Attempt {attempt + 1}/{max_retries} failed for {func.__name__}: {e}. "
-                            f"Retrying in {current_delay}s..."
+                            f"Retrying in {wait}s..."
                         )
-                        time.sleep(current_delay)
+                        time.sleep(wait)
                         current_delay *= backoff
                     else:
                         logger.error(f"All {max_retries} retries failed for {func.__name__}: {e}")
@@ -134,8 +1018,10 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
     return decorator
 
 
-@retry_on_failure(max_retries=api_config.MAX_RETRIES)
-def make_api_request(url: str, headers: Optional[dict] = None, params: Optional[dict] = None) -> dict:
+@retry_on_failure(max_retries=api_config.MAX_RETRIES, max_retry_after=api_config.TMDB_RATE_MAX_WAIT)
+def make_api_request(url: str, headers: Optional[dict] = None, params: Optional[dict] = None,
+                     session: Optional[requests.Session] = None,
+                     rate_limiter: Optional[TokenBucket] = None) -> dict:
     """
     Make API request with retry logic and error handling
     
@@ -143,6 +1029,9 @@ def make_api_request(url: str, headers: Optional[dict] = None, params: Optional[
         url: API endpoint URL
         headers: Optional request headers
         params: Optional query parameters
+        session: Optional session to reuse pooled connections
+        rate_limiter: Optional limiter to wait on before each attempt; a 429
+            response pauses it for the Retry-After delay
     
     Returns:
         JSON response as dictionary
@@ -150,13 +1039,17 @@ def make_api_request(url: str, headers: Optional[dict] = None, params: Optional[
     Raises:
         requests.RequestException: If all retries fail
     """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
     try:
-        response = requests.get(
+        response = (session or requests).get(
             url,
             headers=headers,
             params=params,
             timeout=api_config.REQUEST_TIMEOUT
         )
+        if response.status_code == 429 and rate_limiter is not None:
+            rate_limiter.penalize(parse_retry_after(response.headers.get('Retry-After')) or 1.0)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e: